@@ -1,9 +1,12 @@
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 import pandas as pd
 import numpy as np
+import altair as alt
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 1 ▸ PAGE CONFIG (must be first Streamlit call)
@@ -464,11 +467,26 @@ footer { visibility: hidden; }
 # ──────────────────────────────────────────────────────────────────────────────
 API_BASE_URL = os.getenv("FASTAPI_URL", "http://localhost:8000")
 
+@st.cache_resource(show_spinner=False)
+def get_session() -> requests.Session:
+    """One pooled keep-alive session shared by every rerun, with retries on transient errors."""
+    session = requests.Session()
+    retries = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET", "POST"],   # predictions are idempotent
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 @st.cache_data(ttl=10, show_spinner=False)
 def check_api_health() -> tuple[bool, str]:
     """Returns (is_healthy, error_message)."""
     try:
-        r = requests.get(f"{API_BASE_URL}/", timeout=5)
+        r = get_session().get(f"{API_BASE_URL}/", timeout=5)
         data = r.json()
         if data.get("status") == "ok" and data.get("model_loaded") and data.get("preprocessor_loaded"):
             return True, ""
@@ -476,6 +494,19 @@ def check_api_health() -> tuple[bool, str]:
     except Exception as e:
         return False, str(e)
 
+@st.cache_data(max_entries=512, show_spinner=False)
+def fetch_prediction(payload: dict) -> tuple[dict, float, float | None]:
+    """
+    POST /predict, memoized per payload so reruns never re-send an identical request.
+    Returns (result, round_trip_ms, server_ms).
+    """
+    start = time.perf_counter()
+    response = get_session().post(f"{API_BASE_URL}/predict", json=payload, timeout=15)
+    round_trip_ms = (time.perf_counter() - start) * 1000
+    response.raise_for_status()
+    server_ms = response.headers.get("X-Process-Time-Ms")
+    return response.json(), round_trip_ms, float(server_ms) if server_ms else None
+
 api_ok, _api_error = check_api_health()
 model_loaded = api_ok
 if not api_ok:
@@ -497,6 +528,20 @@ TREE_DICT = {
 WILDERNESS_OPTIONS = [f"Wilderness_Area{i}" for i in range(1, 5)]
 SOIL_OPTIONS       = [f"Soil_Type{i}"       for i in range(1, 41)]
 
+# Sweepable features → (label, min, max), matching the input widget ranges
+SWEEP_FEATURES = {
+    "Elevation":                          ("Elevation (m)",                1800, 4000),
+    "Aspect":                             ("Aspect (°)",                      0,  360),
+    "Slope":                              ("Slope (°)",                       0,   60),
+    "Horizontal_Distance_To_Hydrology":   ("Horiz. distance to water (m)",    0, 1500),
+    "Vertical_Distance_To_Hydrology":     ("Vert. distance to water (m)",  -200,  600),
+    "Horizontal_Distance_To_Roadways":    ("Horiz. distance to road (m)",     0, 7000),
+    "Horizontal_Distance_To_Fire_Points": ("Horiz. distance to fire (m)",     0, 7000),
+    "Hillshade_9am":                      ("9 AM hillshade",                  0,  255),
+    "Hillshade_Noon":                     ("Noon hillshade",                  0,  255),
+    "Hillshade_3pm":                      ("3 PM hillshade",                  0,  255),
+}
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 5 ▸ HERO HEADER
 # ──────────────────────────────────────────────────────────────────────────────
@@ -520,117 +565,235 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 6 ▸ INPUT PANEL  (3 glassmorphic columns)
+# 6 ▸ TABS  —  single observation vs. batch survey upload
 # ──────────────────────────────────────────────────────────────────────────────
-col1, col2, col3 = st.columns(3, gap="medium")
-
-# ── Column 1: Geography ──────────────────────────────────────────────────────
-with col1:
-    st.markdown('<div class="section-card"><div class="section-label">⛰  Geography</div>', unsafe_allow_html=True)
-    elevation = st.number_input(
-        "Elevation (meters)", min_value=1800, max_value=4000, value=2500, step=10,
-        help="Elevation above sea level in meters (range: 1800–4000 m)"
-    )
-    aspect = st.slider(
-        "Aspect (degrees)", 0, 360, 150,
-        help="Compass bearing the slope faces — 0°/360° = North, 180° = South"
-    )
-    slope = st.slider(
-        "Slope (degrees)", 0, 60, 15,
-        help="Steepness of terrain in degrees"
+# The batch tab is rendered first so a `st.stop()` in the single-observation flow
+# never blanks it out; tab display order is set by `st.tabs`, not by code order.
+single_tab, batch_tab = st.tabs(["🌲  Single Observation", "📦  Batch Survey Upload"])
+
+BATCH_CHUNK_OPTIONS = [1_000, 5_000, 10_000, 25_000]
+BATCH_PAGE_SIZE     = 100
+CONFIDENCE_BINS     = np.linspace(0.0, 1.0, 21)
+
+def post_batch_chunk(chunk: pd.DataFrame) -> dict:
+    """Sends one chunk to /predict/batch as CSV over the pooled session."""
+    csv_bytes = chunk.to_csv(index=False).encode("utf-8")
+    response = get_session().post(
+        f"{API_BASE_URL}/predict/batch",
+        files={"file": ("chunk.csv", csv_bytes, "text/csv")},
+        timeout=120,
     )
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ── Column 2: Hydrology & Amenities ─────────────────────────────────────────
-with col2:
-    st.markdown('<div class="section-card"><div class="section-label">💧  Hydrology & Amenities</div>', unsafe_allow_html=True)
-    h_dist_hydro = st.number_input(
-        "Horiz. distance to water (m)", 0, 1500, 200, step=10,
-        help="Horizontal distance to nearest surface water feature"
-    )
-    v_dist_hydro = st.number_input(
-        "Vert. distance to water (m)", -200, 600, 50, step=5,
-        help="Vertical distance to water; negative = below water level"
+    response.raise_for_status()
+    return response.json()
+
+def render_batch_charts(counts: np.ndarray, conf_hist: np.ndarray, counts_slot, hist_slot):
+    counts_df = pd.DataFrame(
+        {"Rows": counts}, index=[TREE_DICT[i + 1][0] for i in range(7)]
     )
-    h_dist_road = st.number_input(
-        "Horiz. distance to road (m)", 0, 7000, 1000, step=50,
-        help="Horizontal distance to nearest road or trail"
+    hist_df = pd.DataFrame(
+        {"Rows": conf_hist},
+        index=[f"{lo:.2f}" for lo in CONFIDENCE_BINS[:-1]],
     )
-    h_dist_fire = st.number_input(
-        "Horiz. distance to fire point (m)", 0, 7000, 1000, step=50,
-        help="Horizontal distance to nearest wildfire ignition point"
+    hist_df.index.name = "Confidence"
+    with counts_slot.container():
+        st.markdown('<div class="section-label">Predicted Class Counts</div>', unsafe_allow_html=True)
+        st.bar_chart(counts_df, height=260, use_container_width=True)
+    with hist_slot.container():
+        st.markdown('<div class="section-label">Confidence Histogram</div>', unsafe_allow_html=True)
+        st.bar_chart(hist_df, height=260, use_container_width=True)
+
+with batch_tab:
+    st.caption(
+        "Upload a survey CSV with the 54 raw input columns. Rows are streamed to the "
+        "backend in chunks and results render as each chunk returns."
     )
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ── Column 3: Hillshade ──────────────────────────────────────────────────────
-with col3:
-    st.markdown('<div class="section-card"><div class="section-label">☀  Hillshade Index</div>', unsafe_allow_html=True)
-    hillshade_9am  = st.slider("9 AM hillshade",   0, 255, 200, help="Solar illumination at 09:00 (0 = full shadow, 255 = full sun)")
-    hillshade_noon = st.slider("Noon hillshade",   0, 255, 220, help="Solar illumination at 12:00")
-    hillshade_3pm  = st.slider("3 PM hillshade",   0, 255, 140, help="Solar illumination at 15:00")
-
-    # Live mini-sparkline: hillshade curve across the day
-    shade_df = pd.DataFrame({
-        "Hour":      ["9 AM", "Noon", "3 PM"],
-        "Hillshade": [hillshade_9am, hillshade_noon, hillshade_3pm],
-    })
-    st.caption("Solar arc preview")
-    st.line_chart(shade_df.set_index("Hour"), height=90, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ── Location & Soil expander ─────────────────────────────────────────────────
-with st.expander("📍 Location & Soil Composition", expanded=True):
-    cat_c1, cat_c2 = st.columns(2)
-    with cat_c1:
-        selected_wilderness = st.selectbox(
-            "Wilderness Area",
-            WILDERNESS_OPTIONS,
-            help="One of four designated wilderness areas within the study zone"
-        )
-    with cat_c2:
-        selected_soil = st.selectbox(
-            "Dominant Soil Type",
-            SOIL_OPTIONS,
-            help="40 soil types derived from USFS ELU survey data (types 1–40)"
+    up_c1, up_c2 = st.columns([3, 1])
+    with up_c1:
+        uploaded = st.file_uploader("Survey CSV", type=["csv"])
+    with up_c2:
+        chunk_rows = st.selectbox("Rows per chunk", BATCH_CHUNK_OPTIONS, index=1)
+
+    scored_now = False
+    if uploaded is not None and st.button("📤  Score Survey", type="primary", use_container_width=True):
+        scored_now = True
+        # Rough row count for the progress bar (newlines minus the header)
+        total_rows = max(uploaded.getvalue().count(b"\n") - 1, 1)
+        uploaded.seek(0)
+
+        progress     = st.progress(0.0, text="Starting upload…")
+        chart_c1, chart_c2 = st.columns(2)
+        counts_slot  = chart_c1.empty()
+        hist_slot    = chart_c2.empty()
+
+        counts       = np.zeros(7, dtype=np.int64)
+        conf_hist    = np.zeros(len(CONFIDENCE_BINS) - 1, dtype=np.int64)
+        id_parts, conf_parts = [], []
+        done_rows    = 0
+        batch_start  = time.perf_counter()
+
+        try:
+            for chunk in pd.read_csv(uploaded, chunksize=chunk_rows):
+                result = post_batch_chunk(chunk)
+                preds = result["predictions"]
+                ids   = np.fromiter((p["cover_type_id"] for p in preds), dtype=np.int8, count=len(preds))
+                confs = np.fromiter((max(p["probabilities"].values()) for p in preds), dtype=np.float32, count=len(preds))
+
+                id_parts.append(ids)
+                conf_parts.append(confs)
+                counts    += np.bincount(ids - 1, minlength=7)
+                conf_hist += np.histogram(confs, bins=CONFIDENCE_BINS)[0]
+                done_rows += len(preds)
+
+                elapsed = time.perf_counter() - batch_start
+                progress.progress(
+                    min(done_rows / total_rows, 1.0),
+                    text=f"Scored {done_rows:,} / ~{total_rows:,} rows · {done_rows / elapsed:,.0f} rows/s",
+                )
+                render_batch_charts(counts, conf_hist, counts_slot, hist_slot)
+        except requests.exceptions.HTTPError as e:
+            detail = e.response.json().get("detail", e.response.text)
+            st.error(f"⚠️ API Error {e.response.status_code} after {done_rows:,} rows: {detail}")
+        except Exception as e:
+            st.error(f"⚠️ Batch upload stopped after {done_rows:,} rows: {e}")
+
+        if id_parts:
+            progress.progress(1.0, text=f"✅ Scored {done_rows:,} rows in {time.perf_counter() - batch_start:.1f}s")
+            # Keep compact columns only; the table below renders one page at a time
+            batch_df = pd.DataFrame({
+                "cover_type_id": np.concatenate(id_parts),
+                "confidence":    np.concatenate(conf_parts),
+            })
+            st.session_state["batch_results"]   = batch_df
+            st.session_state["batch_counts"]    = counts
+            st.session_state["batch_conf_hist"] = conf_hist
+            st.session_state["batch_csv"]       = batch_df.assign(
+                cover_type_name=batch_df["cover_type_id"].map(lambda c: TREE_DICT[c][0])
+            ).to_csv(index_label="row_index")
+
+    batch_results = st.session_state.get("batch_results")
+    if batch_results is not None:
+        if not scored_now:
+            chart_c1, chart_c2 = st.columns(2)
+            render_batch_charts(
+                st.session_state["batch_counts"], st.session_state["batch_conf_hist"],
+                chart_c1.empty(), chart_c2.empty(),
+            )
+        st.divider()
+        n_pages = max((len(batch_results) - 1) // BATCH_PAGE_SIZE + 1, 1)
+        pg_c1, pg_c2 = st.columns([1, 3])
+        with pg_c1:
+            page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1)
+        with pg_c2:
+            st.download_button(
+                "⬇️  Download all predictions (CSV)",
+                st.session_state["batch_csv"],
+                file_name="forest_cover_predictions.csv",
+                mime="text/csv",
+                use_container_width=True,
+            )
+
+        page_df = batch_results.iloc[(page - 1) * BATCH_PAGE_SIZE : page * BATCH_PAGE_SIZE]
+        st.dataframe(
+            pd.DataFrame({
+                "Species":    [f"{TREE_DICT[c][1]} {TREE_DICT[c][0]}" for c in page_df["cover_type_id"]],
+                "Confidence": (page_df["confidence"] * 100).round(1).astype(str) + "%",
+            }, index=page_df.index.rename("Row")),
+            use_container_width=True,
+            height=min(38 + 35 * len(page_df), 420),
         )
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 7 ▸ VALIDATION HELPER
-# ──────────────────────────────────────────────────────────────────────────────
-def validate_inputs():
-    """Return list of error strings; empty list = all good."""
-    errors = []
-    if not (1800 <= elevation <= 4000):
-        errors.append("Elevation must be between 1,800 m and 4,000 m.")
-    if not (0 <= slope <= 60):
-        errors.append("Slope must be between 0° and 60°.")
-    if not (-200 <= v_dist_hydro <= 600):
-        errors.append("Vertical distance to hydrology must be −200 to 600 m.")
-    return errors
+with single_tab:
+    # ──────────────────────────────────────────────────────────────────────────────
+    # 7 ▸ INPUT PANEL  (3 glassmorphic columns)
+    # ──────────────────────────────────────────────────────────────────────────────
+    col1, col2, col3 = st.columns(3, gap="medium")
+
+    # ── Column 1: Geography ──────────────────────────────────────────────────────
+    with col1:
+        st.markdown('<div class="section-card"><div class="section-label">⛰  Geography</div>', unsafe_allow_html=True)
+        elevation = st.number_input(
+            "Elevation (meters)", min_value=1800, max_value=4000, value=2500, step=10,
+            help="Elevation above sea level in meters (range: 1800–4000 m)"
+        )
+        aspect = st.slider(
+            "Aspect (degrees)", 0, 360, 150,
+            help="Compass bearing the slope faces — 0°/360° = North, 180° = South"
+        )
+        slope = st.slider(
+            "Slope (degrees)", 0, 60, 15,
+            help="Steepness of terrain in degrees"
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ── Column 2: Hydrology & Amenities ─────────────────────────────────────────
+    with col2:
+        st.markdown('<div class="section-card"><div class="section-label">💧  Hydrology & Amenities</div>', unsafe_allow_html=True)
+        h_dist_hydro = st.number_input(
+            "Horiz. distance to water (m)", 0, 1500, 200, step=10,
+            help="Horizontal distance to nearest surface water feature"
+        )
+        v_dist_hydro = st.number_input(
+            "Vert. distance to water (m)", -200, 600, 50, step=5,
+            help="Vertical distance to water; negative = below water level"
+        )
+        h_dist_road = st.number_input(
+            "Horiz. distance to road (m)", 0, 7000, 1000, step=50,
+            help="Horizontal distance to nearest road or trail"
+        )
+        h_dist_fire = st.number_input(
+            "Horiz. distance to fire point (m)", 0, 7000, 1000, step=50,
+            help="Horizontal distance to nearest wildfire ignition point"
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ── Column 3: Hillshade ──────────────────────────────────────────────────────
+    with col3:
+        st.markdown('<div class="section-card"><div class="section-label">☀  Hillshade Index</div>', unsafe_allow_html=True)
+        hillshade_9am  = st.slider("9 AM hillshade",   0, 255, 200, help="Solar illumination at 09:00 (0 = full shadow, 255 = full sun)")
+        hillshade_noon = st.slider("Noon hillshade",   0, 255, 220, help="Solar illumination at 12:00")
+        hillshade_3pm  = st.slider("3 PM hillshade",   0, 255, 140, help="Solar illumination at 15:00")
+
+        # Live mini-sparkline: hillshade curve across the day
+        shade_df = pd.DataFrame({
+            "Hour":      ["9 AM", "Noon", "3 PM"],
+            "Hillshade": [hillshade_9am, hillshade_noon, hillshade_3pm],
+        })
+        st.caption("Solar arc preview")
+        st.line_chart(shade_df.set_index("Hour"), height=90, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ── Location & Soil expander ─────────────────────────────────────────────────
+    with st.expander("📍 Location & Soil Composition", expanded=True):
+        cat_c1, cat_c2 = st.columns(2)
+        with cat_c1:
+            selected_wilderness = st.selectbox(
+                "Wilderness Area",
+                WILDERNESS_OPTIONS,
+                help="One of four designated wilderness areas within the study zone"
+            )
+        with cat_c2:
+            selected_soil = st.selectbox(
+                "Dominant Soil Type",
+                SOIL_OPTIONS,
+                help="40 soil types derived from USFS ELU survey data (types 1–40)"
+            )
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 8 ▸ RUN ANALYSIS BUTTON
-# ──────────────────────────────────────────────────────────────────────────────
-st.markdown("<br>", unsafe_allow_html=True)
-run_btn = st.button("🚀  Run AI Analysis", type="primary", use_container_width=True)
-
-if run_btn:
-    # — Validate —
-    validation_errors = validate_inputs()
-    if validation_errors:
-        for err in validation_errors:
-            st.error(f"⚠️ {err}")
-        st.stop()
-
-    with st.spinner("Compiling spatial features · Running XGBoost inference…"):
-        time.sleep(0.6)   # intentional UX pause — makes inference feel substantial
-
-        # ── Feature engineering values (for display only) ──
-        euclidean_hydro  = np.sqrt(h_dist_hydro**2 + v_dist_hydro**2)
-        water_elevation  = elevation - v_dist_hydro
-        dist_amenities   = (h_dist_road + h_dist_fire) / 2.0
-
-        # ── Build API payload (raw features + one-hot encodings) ──
+    # ──────────────────────────────────────────────────────────────────────────────
+    # 8 ▸ VALIDATION HELPER
+    # ──────────────────────────────────────────────────────────────────────────────
+    def validate_inputs():
+        """Return list of error strings; empty list = all good."""
+        errors = []
+        if not (1800 <= elevation <= 4000):
+            errors.append("Elevation must be between 1,800 m and 4,000 m.")
+        if not (0 <= slope <= 60):
+            errors.append("Slope must be between 0° and 60°.")
+        if not (-200 <= v_dist_hydro <= 600):
+            errors.append("Vertical distance to hydrology must be −200 to 600 m.")
+        return errors
+
+    def build_payload() -> dict:
+        """Raw API payload (10 continuous features + one-hot encodings) from the widgets."""
         payload = {
             "Elevation":                          elevation,
             "Aspect":                             aspect,
@@ -647,117 +810,225 @@ if run_btn:
             payload[f"Wilderness_Area{i}"] = 1 if selected_wilderness == f"Wilderness_Area{i}" else 0
         for i in range(1, 41):
             payload[f"Soil_Type{i}"] = 1 if selected_soil == f"Soil_Type{i}" else 0
+        return payload
 
-        # ── Call FastAPI /predict ──
-        try:
-            response = requests.post(f"{API_BASE_URL}/predict", json=payload, timeout=15)
-            response.raise_for_status()
-            result = response.json()
-
-            prediction_idx = result["cover_type_id"]           # 1-indexed
-            prob_dict      = result["probabilities"]            # {name: float}
+    # ──────────────────────────────────────────────────────────────────────────────
+    # 9 ▸ RUN ANALYSIS BUTTON
+    # ──────────────────────────────────────────────────────────────────────────────
+    st.markdown("<br>", unsafe_allow_html=True)
+    run_btn = st.button("🚀  Run AI Analysis", type="primary", use_container_width=True)
+
+    if run_btn:
+        # — Validate —
+        validation_errors = validate_inputs()
+        if validation_errors:
+            for err in validation_errors:
+                st.error(f"⚠️ {err}")
+            st.stop()
 
-            # Rebuild ordered probabilities array (index 0 = class 1 … index 6 = class 7)
-            probabilities = np.array([
-                prob_dict.get(TREE_DICT[i][0], 0.0) for i in range(1, 8)
-            ])
-            confidence = float(np.max(probabilities)) * 100
+        with st.spinner("Compiling spatial features · Running XGBoost inference…"):
+            # ── Feature engineering values (for display only) ──
+            euclidean_hydro  = np.sqrt(h_dist_hydro**2 + v_dist_hydro**2)
+            water_elevation  = elevation - v_dist_hydro
+            dist_amenities   = (h_dist_road + h_dist_fire) / 2.0
+
+            # ── Build API payload (raw features + one-hot encodings) ──
+            payload = build_payload()
+
+            # ── Call FastAPI /predict ──
+            try:
+                click_start = time.perf_counter()
+                result, round_trip_ms, server_ms = fetch_prediction(payload)
+                click_ms = (time.perf_counter() - click_start) * 1000
+
+                prediction_idx = result["cover_type_id"]           # 1-indexed
+                prob_dict      = result["probabilities"]            # {name: float}
+
+                # API returns classes in id order, so index 0 = class 1 … index 6 = class 7
+                # (its names differ from TREE_DICT's display names, e.g. "Spruce/Fir")
+                probabilities = np.array(list(prob_dict.values()))
+                confidence = float(np.max(probabilities)) * 100
+
+                tree_name, tree_icon, tree_color = TREE_DICT.get(
+                    prediction_idx, ("Unknown", "❓", "#6b7280")
+                )
+
+            except requests.exceptions.HTTPError as e:
+                detail = e.response.json().get("detail", e.response.text)
+                st.error(f"⚠️ API Error {e.response.status_code}: {detail}")
+                st.stop()
+            except Exception as e:
+                st.error(f"⚠️ Could not reach the API: {e}")
+                st.info(f"Make sure the FastAPI backend is running at `{API_BASE_URL}`.")
+                st.stop()
+
+        # ──────────────────────────────────────────────────────────────────────────
+        # 10 ▸ RESULTS PANEL
+        # ──────────────────────────────────────────────────────────────────────────
+        st.divider()
+        st.markdown('<div class="result-header">Analysis Output</div>', unsafe_allow_html=True)
+
+        st.success("✅ Inference complete")
+        # A click faster than the recorded round-trip can only have come from the memo cache
+        from_cache = click_ms < round_trip_ms
+        server_txt = f"{server_ms:.1f} ms" if server_ms is not None else "n/a"
+        st.caption(
+            f"⏱ This click: {click_ms:.1f} ms{' (memoized)' if from_cache else ''} · "
+            f"API round-trip: {round_trip_ms:.1f} ms · Server-side: {server_txt}"
+        )
 
-            tree_name, tree_icon, tree_color = TREE_DICT.get(
-                prediction_idx, ("Unknown", "❓", "#6b7280")
+        # ── Primary metrics row ──
+        m1, m2, m3 = st.columns(3)
+        with m1:
+            st.metric(label="🌲  Predicted Forest Cover", value=f"{tree_icon} {tree_name}")
+        with m2:
+            st.metric(label="🎯  Confidence Score",       value=f"{confidence:.1f}%")
+        with m3:
+            rank = sorted(enumerate(probabilities), key=lambda x: -x[1])
+            runner_up_idx = rank[1][0] + 1
+            runner_up_name = TREE_DICT.get(runner_up_idx, ("Unknown", "❓", "#6b7280"))[0]
+            runner_up_pct  = rank[1][1] * 100
+            st.metric(label="🥈  Runner-Up Species", value=runner_up_name,
+                      delta=f"{runner_up_pct:.1f}% probability")
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # ── Probability breakdown — custom HTML bars ──
+        result_col, info_col = st.columns([3, 2], gap="large")
+
+        with result_col:
+            st.markdown('<div class="section-label">Probability Distribution</div>', unsafe_allow_html=True)
+
+            # Sort all 7 classes by probability descending
+            sorted_probs = sorted(
+                [(TREE_DICT[i+1][0], TREE_DICT[i+1][1], float(p)) for i, p in enumerate(probabilities)],
+                key=lambda x: -x[2],
             )
+            # Find max for relative bar width scaling
+            max_prob = sorted_probs[0][2]
+
+            bar_html = ""
+            for (name, icon, prob) in sorted_probs:
+                bar_width = (prob / max_prob) * 100 if max_prob > 0 else 0
+                highlight = "color:#4ade80;" if prob == max_prob else ""
+                bar_html += f"""
+                <div class="prob-row">
+                    <span class="prob-label" style="{highlight}">{icon} {name}</span>
+                    <div class="prob-bar-track">
+                        <div class="prob-bar-fill" style="width:{bar_width:.1f}%"></div>
+                    </div>
+                    <span class="prob-pct">{prob*100:.1f}%</span>
+                </div>
+                """
+            st.markdown(bar_html, unsafe_allow_html=True)
+
+        with info_col:
+            st.markdown('<div class="section-label">Feature Summary</div>', unsafe_allow_html=True)
+            summary_data = {
+                "Parameter":    ["Elevation", "Slope", "Aspect", "H₂O Distance", "Road Distance", "Wilderness", "Soil Type"],
+                "Value":        [
+                    f"{elevation:,} m",
+                    f"{slope}°",
+                    f"{aspect}°",
+                    f"{h_dist_hydro} m",
+                    f"{h_dist_road} m",
+                    selected_wilderness.replace("Wilderness_Area", "Area "),
+                    selected_soil.replace("Soil_Type", "Type "),
+                ],
+            }
+            summary_df = pd.DataFrame(summary_data).set_index("Parameter")
+            st.dataframe(summary_df, use_container_width=True, height=280)
+
+        # ── Engineered features callout ──
+        with st.expander("🔧 Engineered Features Used in Inference", expanded=False):
+            eng_col1, eng_col2, eng_col3 = st.columns(3)
+            with eng_col1:
+                st.metric("Euclidean Hydro Distance", f"{euclidean_hydro:.1f} m")
+            with eng_col2:
+                st.metric("Water-Adjusted Elevation", f"{water_elevation:.0f} m")
+            with eng_col3:
+                st.metric("Avg. Amenity Distance",    f"{dist_amenities:.0f} m")
+
+    # ──────────────────────────────────────────────────────────────────────────────
+    # 11 ▸ WHAT-IF SENSITIVITY SWEEP  (one batched /predict/sweep call)
+    # ──────────────────────────────────────────────────────────────────────────────
+    st.divider()
+    st.markdown('<div class="result-header">What-If Sensitivity Sweep</div>', unsafe_allow_html=True)
+    st.caption("Vary one or two parameters around the observation above — the whole grid is scored server-side in a single call.")
+
+    sw_c1, sw_c2, sw_c3 = st.columns([2, 2, 1])
+    with sw_c1:
+        sweep_x = st.selectbox(
+            "Primary feature", list(SWEEP_FEATURES), format_func=lambda f: SWEEP_FEATURES[f][0]
+        )
+    with sw_c2:
+        sweep_y = st.selectbox(
+            "Second feature (optional)", ["None"] + [f for f in SWEEP_FEATURES if f != sweep_x],
+            format_func=lambda f: "—" if f == "None" else SWEEP_FEATURES[f][0],
+        )
+    with sw_c3:
+        sweep_steps = st.number_input("Steps per axis", min_value=5, max_value=100, value=40 if sweep_y == "None" else 20)
+
+    sweep_axes = []
+    for feature in [sweep_x] if sweep_y == "None" else [sweep_x, sweep_y]:
+        label, lo, hi = SWEEP_FEATURES[feature]
+        start, stop = st.slider(f"{label} range", lo, hi, (lo, hi), key=f"sweep_range_{feature}")
+        sweep_axes.append({"feature": feature, "start": start, "stop": stop, "steps": int(sweep_steps)})
 
-        except requests.exceptions.HTTPError:
-            detail = response.json().get("detail", response.text)
-            st.error(f"⚠️ API Error {response.status_code}: {detail}")
+    if st.button("📈  Run Sweep", use_container_width=True):
+        try:
+            response = get_session().post(
+                f"{API_BASE_URL}/predict/sweep",
+                json={"base": build_payload(), "axes": sweep_axes},
+                timeout=30,
+            )
+            response.raise_for_status()
+            sweep = response.json()
+        except requests.exceptions.HTTPError as e:
+            detail = e.response.json().get("detail", e.response.text)
+            st.error(f"⚠️ API Error {e.response.status_code}: {detail}")
             st.stop()
         except Exception as e:
             st.error(f"⚠️ Could not reach the API: {e}")
-            st.info(f"Make sure the FastAPI backend is running at `{API_BASE_URL}`.")
             st.stop()
 
-    # ──────────────────────────────────────────────────────────────────────────
-    # 9 ▸ RESULTS PANEL
-    # ──────────────────────────────────────────────────────────────────────────
-    st.divider()
-    st.markdown('<div class="result-header">Analysis Output</div>', unsafe_allow_html=True)
-
-    st.success("✅ Inference complete")
-
-    # ── Primary metrics row ──
-    m1, m2, m3 = st.columns(3)
-    with m1:
-        st.metric(label="🌲  Predicted Forest Cover", value=f"{tree_icon} {tree_name}")
-    with m2:
-        st.metric(label="🎯  Confidence Score",       value=f"{confidence:.1f}%")
-    with m3:
-        rank = sorted(enumerate(probabilities), key=lambda x: -x[1])
-        runner_up_idx = rank[1][0] + 1
-        runner_up_name = TREE_DICT.get(runner_up_idx, ("Unknown", "❓", "#6b7280"))[0]
-        runner_up_pct  = rank[1][1] * 100
-        st.metric(label="🥈  Runner-Up Species", value=runner_up_name,
-                  delta=f"{runner_up_pct:.1f}% probability")
+        # API returns classes in id order 1–7; show the UI's display names
+        class_labels = [TREE_DICT[i + 1][0] for i in range(len(sweep["class_names"]))]
+        x_label = SWEEP_FEATURES[sweep["features"][0]][0]
+
+        if len(sweep["features"]) == 1:
+            curve_df = pd.DataFrame(sweep["probabilities"], columns=class_labels, index=sweep["values"][0])
+            curve_df.index.name = x_label
+            st.markdown('<div class="section-label">Class Probability vs. Feature</div>', unsafe_allow_html=True)
+            st.line_chart(curve_df, height=360, use_container_width=True)
+        else:
+            y_label = SWEEP_FEATURES[sweep["features"][1]][0]
+            probs = np.asarray(sweep["probabilities"])
+            xs, ys = np.meshgrid(sweep["values"][0], sweep["values"][1], indexing="ij")
+            surface_df = pd.DataFrame({
+                "x":          xs.ravel(),
+                "y":          ys.ravel(),
+                "Species":    [class_labels[c - 1] for c in np.ravel(sweep["cover_type_ids"])],
+                "Confidence": probs.max(axis=-1).ravel(),
+            })
+            heatmap = alt.Chart(surface_df).mark_rect().encode(
+                x=alt.X("x:O", title=x_label, axis=alt.Axis(labelOverlap=True, format=".0f")),
+                y=alt.Y("y:O", title=y_label, sort="descending", axis=alt.Axis(labelOverlap=True, format=".0f")),
+                color=alt.Color("Species:N", scale=alt.Scale(scheme="category10")),
+                opacity=alt.Opacity("Confidence:Q", scale=alt.Scale(domain=[0.3, 1.0]), legend=None),
+                tooltip=[
+                    alt.Tooltip("x:Q", title=x_label, format=".0f"),
+                    alt.Tooltip("y:Q", title=y_label, format=".0f"),
+                    "Species",
+                    alt.Tooltip("Confidence:Q", format=".1%"),
+                ],
+            ).properties(height=420)
+            st.markdown('<div class="section-label">Dominant Species Surface</div>', unsafe_allow_html=True)
+            st.altair_chart(heatmap, use_container_width=True)
 
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # ── Probability breakdown — custom HTML bars ──
-    result_col, info_col = st.columns([3, 2], gap="large")
-
-    with result_col:
-        st.markdown('<div class="section-label">Probability Distribution</div>', unsafe_allow_html=True)
-
-        # Sort all 7 classes by probability descending
-        sorted_probs = sorted(
-            [(TREE_DICT[i+1][0], TREE_DICT[i+1][1], float(p)) for i, p in enumerate(probabilities)],
-            key=lambda x: -x[2],
-        )
-        # Find max for relative bar width scaling
-        max_prob = sorted_probs[0][2]
-
-        bar_html = ""
-        for (name, icon, prob) in sorted_probs:
-            bar_width = (prob / max_prob) * 100 if max_prob > 0 else 0
-            highlight = "color:#4ade80;" if prob == max_prob else ""
-            bar_html += f"""
-            <div class="prob-row">
-                <span class="prob-label" style="{highlight}">{icon} {name}</span>
-                <div class="prob-bar-track">
-                    <div class="prob-bar-fill" style="width:{bar_width:.1f}%"></div>
-                </div>
-                <span class="prob-pct">{prob*100:.1f}%</span>
-            </div>
-            """
-        st.markdown(bar_html, unsafe_allow_html=True)
-
-    with info_col:
-        st.markdown('<div class="section-label">Feature Summary</div>', unsafe_allow_html=True)
-        summary_data = {
-            "Parameter":    ["Elevation", "Slope", "Aspect", "H₂O Distance", "Road Distance", "Wilderness", "Soil Type"],
-            "Value":        [
-                f"{elevation:,} m",
-                f"{slope}°",
-                f"{aspect}°",
-                f"{h_dist_hydro} m",
-                f"{h_dist_road} m",
-                selected_wilderness.replace("Wilderness_Area", "Area "),
-                selected_soil.replace("Soil_Type", "Type "),
-            ],
-        }
-        summary_df = pd.DataFrame(summary_data).set_index("Parameter")
-        st.dataframe(summary_df, use_container_width=True, height=280)
-
-    # ── Engineered features callout ──
-    with st.expander("🔧 Engineered Features Used in Inference", expanded=False):
-        eng_col1, eng_col2, eng_col3 = st.columns(3)
-        with eng_col1:
-            st.metric("Euclidean Hydro Distance", f"{euclidean_hydro:.1f} m")
-        with eng_col2:
-            st.metric("Water-Adjusted Elevation", f"{water_elevation:.0f} m")
-        with eng_col3:
-            st.metric("Avg. Amenity Distance",    f"{dist_amenities:.0f} m")
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 10 ▸ FOOTER
+# 12 ▸ FOOTER
 # ──────────────────────────────────────────────────────────────────────────────
 st.markdown("""
 <div class="footer-text">
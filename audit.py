@@ -0,0 +1,429 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from features import RAW_FEATURES
+
+# ──────────────────────────────────────────────
+# Prediction Audit Log
+# ──────────────────────────────────────────────
+# Requests only append a reference to their (inputs, outputs) onto a bounded in-memory
+# buffer; a background thread turns them into columnar batches and appends them to
+# rotating local files. When the buffer is full new records are dropped and counted,
+# so a slow disk can never stall the request path.
+AUDIT_FORMATS = ("sqlite", "parquet")
+PROBA_COLUMNS = [f"proba_{i}" for i in range(1, 8)]
+
+
+def _raw_values(df_raw: pd.DataFrame) -> np.ndarray:
+    if list(df_raw.columns) != RAW_FEATURES:
+        df_raw = df_raw.reindex(columns=RAW_FEATURES, fill_value=0)
+    return df_raw.to_numpy(dtype=np.float64)
+
+
+def _audit_frame(records: list) -> pd.DataFrame:
+    """
+    One row per scored observation: metadata, the 54 raw inputs, class and probabilities.
+    Built column-wise from concatenated arrays, one DataFrame per flush.
+    """
+    ts, request_ids, endpoints, frames, preds, probas, rounds, cascade = zip(*records)
+    counts = np.array([len(p) for p in preds])
+    values = np.concatenate([_raw_values(df) for df in frames])
+
+    columns = {
+        "ts": np.repeat(np.asarray(ts, dtype=np.float64), counts),
+        "request_id": np.repeat(np.asarray(request_ids, dtype=object), counts),
+        "endpoint": np.repeat(np.asarray(endpoints, dtype=object), counts),
+        "row_index": np.concatenate([np.arange(n, dtype=np.int32) for n in counts]),
+    }
+    columns.update({name: values[:, j] for j, name in enumerate(RAW_FEATURES)})
+    columns["cover_type_id"] = (np.concatenate(preds) + 1).astype(np.int8)
+    proba_matrix = np.concatenate(probas).astype(np.float32)
+    columns.update({name: proba_matrix[:, j] for j, name in enumerate(PROBA_COLUMNS)})
+    # 0 means the full model, as with XGBoost's iteration_range
+    columns["rounds_used"] = np.repeat(np.asarray([r or 0 for r in rounds], dtype=np.int32), counts)
+    columns["cascade"] = np.repeat(np.asarray(cascade, dtype=bool), counts)
+    return pd.DataFrame(columns)
+
+
+class _SqliteFile:
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+
+    def append(self, frame: pd.DataFrame):
+        frame.to_sql("predictions", self.conn, if_exists="append", index=False)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class _ParquetFile:
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+        self.path = path
+        self.pq = pq
+        self.writer = None
+
+    def append(self, frame: pd.DataFrame):
+        import pyarrow as pa
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        # Each flush becomes one row group
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class AuditSink:
+    """
+    Bounded ring buffer plus a background writer.
+
+    `submit()` is O(1) and never blocks: it stores a reference to the request's raw input
+    frame and NumPy outputs. The writer flushes every `flush_rows` rows or
+    `flush_interval_s` seconds, whichever comes first, and starts a new file once the
+    current one holds `rotate_rows` rows.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = "sqlite",
+        capacity_rows: int = 100_000,
+        flush_rows: int = 5_000,
+        flush_interval_s: float = 1.0,
+        rotate_rows: int = 1_000_000,
+    ):
+        if fmt not in AUDIT_FORMATS:
+            raise ValueError(f"Unknown audit format '{fmt}'. Choose one of: {', '.join(AUDIT_FORMATS)}")
+        if fmt == "parquet":
+            # Fail at startup, not in the writer thread
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError("The parquet audit format needs pyarrow (pip install pyarrow); "
+                                   "install it or use FOREST_AUDIT_FORMAT=sqlite.") from e
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.capacity_rows = capacity_rows
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.rotate_rows = rotate_rows
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.buffered_rows = 0
+        self.high_water_rows = 0
+        self.submitted_rows = 0
+        self.dropped_rows = 0
+        self.dropped_requests = 0
+        self.written_rows = 0
+        self.flushes = 0
+        self.write_seconds = 0.0
+        self.files = []
+        self.last_error = None
+
+        self._file = None
+        self._file_rows = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    # ── request path ─────────────────────────────
+    def submit(self, endpoint: str, df_raw: pd.DataFrame, preds, probas, rounds: int | None = None,
+               cascade: bool = False, request_id: str | None = None) -> bool:
+        """Queues one request's rows. Returns False (and counts a drop) if the buffer is full."""
+        n = len(preds)
+        request_id = request_id or uuid.uuid4().hex
+        with self._cond:
+            if self._closed or self.buffered_rows + n > self.capacity_rows:
+                self.dropped_rows += n
+                self.dropped_requests += 1
+                return False
+            self._buffer.append((time.time(), request_id, endpoint, df_raw, preds, probas, rounds, cascade))
+            self.buffered_rows += n
+            self.submitted_rows += n
+            self.high_water_rows = max(self.high_water_rows, self.buffered_rows)
+            if self.buffered_rows >= self.flush_rows:
+                self._cond.notify()
+        return True
+
+    # ── writer thread ────────────────────────────
+    def _drain(self) -> list:
+        records = list(self._buffer)
+        self._buffer.clear()
+        self.buffered_rows = 0
+        return records
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and self.buffered_rows < self.flush_rows:
+                    self._cond.wait(self.flush_interval_s)
+                records = self._drain()
+                closed = self._closed
+            if records:
+                self._write(records)
+            if closed:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"audit-{stamp}-{len(self.files):04d}.{self.fmt}")
+        self._file = _SqliteFile(path) if self.fmt == "sqlite" else _ParquetFile(path)
+        self._file_rows = 0
+        self.files.append(path)
+
+    def _write(self, records: list):
+        start = time.perf_counter()
+        try:
+            frame = _audit_frame(records)
+            if self._file is None or self._file_rows >= self.rotate_rows:
+                self._rotate()
+            self._file.append(frame)
+            self._file_rows += len(frame)
+            written = len(frame)
+        except Exception as e:
+            # Never take the writer down; the rows are counted as dropped instead
+            self.last_error = f"{type(e).__name__}: {e}"
+            written = 0
+            with self._cond:
+                self.dropped_rows += sum(len(r[4]) for r in records)
+                self.dropped_requests += len(records)
+        with self._cond:
+            self.written_rows += written
+            self.flushes += 1
+            self.write_seconds += time.perf_counter() - start
+
+    def close(self, timeout: float = 10.0):
+        """Flushes whatever is buffered and stops the writer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "format": self.fmt,
+                "directory": self.directory,
+                "capacity_rows": self.capacity_rows,
+                "buffered_rows": self.buffered_rows,
+                "high_water_rows": self.high_water_rows,
+                "submitted_rows": self.submitted_rows,
+                "written_rows": self.written_rows,
+                "dropped_rows": self.dropped_rows,
+                "dropped_requests": self.dropped_requests,
+                "flushes": self.flushes,
+                "write_rows_per_sec": round(self.written_rows / self.write_seconds, 1) if self.write_seconds else None,
+                "current_file": self.files[-1] if self.files else None,
+                "files": len(self.files),
+                "last_error": self.last_error,
+            }
+
+
+# ──────────────────────────────────────────────
+# CLI: request-path overhead at high RPS
+# ──────────────────────────────────────────────
+def _sync_sqlite_insert(conn, df_raw, preds, probas):
+    """What a naive per-request synchronous audit write costs."""
+    _audit_frame([(time.time(), uuid.uuid4().hex, "/predict", df_raw, preds, probas, None, False)]).to_sql(
+        "predictions", conn, if_exists="append", index=False
+    )
+    conn.commit()
+
+
+def benchmark(data_path: str, out_dir: str, fmt: str, rps: int, seconds: float, threads: int, capacity_rows: int) -> pd.DataFrame:
+    """
+    Drives `submit()` with single-row requests from `threads` threads at a combined
+    target rate and reports per-call latency percentiles, achieved RPS and drops.
+    A short run of synchronous per-request SQLite inserts is timed for comparison.
+    """
+    df = pd.read_csv(data_path, nrows=1000).drop(columns=["Cover_Type"], errors="ignore")
+    rows = [df.iloc[[i]] for i in range(len(df))]
+    preds = np.zeros(1, dtype=np.int64)
+    probas = np.full((1, 7), 1 / 7, dtype=np.float32)
+
+    sink = AuditSink(out_dir, fmt=fmt, capacity_rows=capacity_rows)
+    per_thread = rps / threads
+    latencies = [[] for _ in range(threads)]
+
+    def worker(t: int):
+        interval = 1.0 / per_thread
+        deadline = time.perf_counter() + seconds
+        next_at = time.perf_counter()
+        i = t
+        while next_at < deadline:
+            now = time.perf_counter()
+            if now < next_at:
+                time.sleep(next_at - now)
+            start = time.perf_counter()
+            sink.submit("/predict", rows[i % len(rows)], preds, probas)
+            latencies[t].append(time.perf_counter() - start)
+            next_at += interval
+            i += threads
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    wall = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    wall = time.perf_counter() - wall
+    sink.close()
+    stats = sink.stats()
+
+    sub_us = np.concatenate([np.asarray(l) for l in latencies]) * 1e6
+    sync_path = os.path.join(out_dir, "sync-baseline.sqlite")
+    conn = sqlite3.connect(sync_path)
+    sync_us = []
+    for i in range(200):
+        start = time.perf_counter()
+        _sync_sqlite_insert(conn, rows[i % len(rows)], preds, probas)
+        sync_us.append((time.perf_counter() - start) * 1e6)
+    conn.close()
+    os.remove(sync_path)
+
+    report = pd.DataFrame([
+        {
+            "path": f"async {fmt} sink",
+            "achieved_rps": round(len(sub_us) / wall),
+            "p50_us": np.percentile(sub_us, 50),
+            "p99_us": np.percentile(sub_us, 99),
+            "written_rows": stats["written_rows"],
+            "dropped_rows": stats["dropped_rows"],
+            "high_water_rows": stats["high_water_rows"],
+        },
+        {
+            "path": "sync sqlite per request",
+            "achieved_rps": round(1e6 / np.mean(sync_us)),
+            "p50_us": np.percentile(sync_us, 50),
+            "p99_us": np.percentile(sync_us, 99),
+            "written_rows": len(sync_us),
+            "dropped_rows": 0,
+            "high_water_rows": None,
+        },
+    ])
+    print(report.round(1).to_string(index=False))
+    print(f"Audit files: {stats['files']} in {out_dir}")
+    return report
+
+
+def _drive_predict(url: str, payloads: list[dict], rps: int, seconds: float, threads: int) -> tuple[np.ndarray, float]:
+    """
+    Open-loop load on /predict at a combined target rate. Latency is measured from each
+    request's scheduled start, so a server that falls behind shows up as queueing delay
+    instead of silently lowering the offered rate. Returns (latencies in ms, wall seconds).
+    """
+    import requests
+
+    per_thread = rps / threads
+    latencies = [[] for _ in range(threads)]
+
+    def worker(t: int):
+        session = requests.Session()
+        interval = 1.0 / per_thread
+        deadline = time.perf_counter() + seconds
+        next_at = time.perf_counter()
+        i = t
+        while next_at < deadline:
+            now = time.perf_counter()
+            if now < next_at:
+                time.sleep(next_at - now)
+            session.post(f"{url}/predict", json=payloads[i % len(payloads)]).raise_for_status()
+            latencies[t].append(time.perf_counter() - next_at)
+            next_at += interval
+            i += threads
+        session.close()
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    wall = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    return np.concatenate([np.asarray(l) for l in latencies]) * 1000, time.perf_counter() - wall
+
+
+def benchmark_end_to_end(data_path: str, out_dir: str, fmt: str, rps: int, seconds: float, threads: int,
+                         port: int) -> pd.DataFrame:
+    """
+    Starts the API twice, without and with FOREST_AUDIT_DIR, drives /predict at the same
+    rate against each and compares request latency. This includes what `submit()` timing
+    alone cannot see: the writer thread's pandas/SQLite work competing for the GIL.
+    """
+    import requests
+    from forest_client.benchmark import spawn_server
+
+    df = pd.read_csv(data_path, nrows=1000).drop(columns=["Cover_Type"], errors="ignore")
+    payloads = df.to_dict(orient="records")
+    url = f"http://127.0.0.1:{port}"
+
+    rows = []
+    for label, audit_dir in (("audit off", None), (f"audit on ({fmt})", os.path.join(out_dir, "e2e"))):
+        env = {k: v for k, v in os.environ.items() if not k.startswith("FOREST_AUDIT_")}
+        if audit_dir:
+            env.update({"FOREST_AUDIT_DIR": audit_dir, "FOREST_AUDIT_FORMAT": fmt})
+        proc = spawn_server(port, 1, env)
+        try:
+            with requests.Session() as warm:
+                for payload in payloads[:50]:
+                    warm.post(f"{url}/predict", json=payload).raise_for_status()
+            latency_ms, wall = _drive_predict(url, payloads, rps, seconds, threads)
+            audit = requests.get(f"{url}/audit/stats").json()
+        finally:
+            proc.terminate()
+            proc.wait()
+        rows.append({
+            "server": label,
+            "target_rps": rps,
+            "achieved_rps": round(len(latency_ms) / wall),
+            "p50_ms": np.percentile(latency_ms, 50),
+            "p99_ms": np.percentile(latency_ms, 99),
+            "dropped_rows": audit.get("dropped_rows"),
+        })
+
+    report = pd.DataFrame(rows)
+    print(report.round(2).to_string(index=False))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the request-path overhead of the audit sink.")
+    parser.add_argument("--data", default="holdout.csv", help="CSV with the raw input columns")
+    parser.add_argument("--out-dir", default="audit_bench")
+    parser.add_argument("--format", choices=AUDIT_FORMATS, default="sqlite")
+    parser.add_argument("--rps", type=int, default=5000, help="Combined target requests/sec")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=100_000, help="Ring buffer capacity in rows")
+    parser.add_argument(
+        "--end-to-end", action="store_true",
+        help="Instead, start the API with the sink off and on and compare /predict latency at --rps",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Port for the --end-to-end servers")
+    args = parser.parse_args()
+    if args.end_to_end:
+        benchmark_end_to_end(args.data, args.out_dir, args.format, args.rps, args.seconds, args.threads, args.port)
+    else:
+        benchmark(args.data, args.out_dir, args.format, args.rps, args.seconds, args.threads, args.capacity)
+
+
+if __name__ == "__main__":
+    main()
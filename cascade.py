@@ -0,0 +1,206 @@
+import argparse
+import threading
+import time
+
+import joblib
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import matthews_corrcoef
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_sample_weight
+
+from features import load_dataset
+
+# ──────────────────────────────────────────────
+# Cascade Configuration
+# ──────────────────────────────────────────────
+CASCADE_PATH = "cascade_student.joblib"
+
+# Shallow first stage: a handful of depth-4 rounds, cheap enough to run on every row
+STUDENT_PARAMS = {
+    "objective": "multi:softprob",
+    "num_class": 7,
+    "tree_method": "hist",
+    "random_state": 42,
+    "n_estimators": 40,
+    "max_depth": 4,
+    "learning_rate": 0.3,
+    # Lets the student train on the categorical variant's DataFrame output as well
+    "enable_categorical": True,
+}
+
+
+# ──────────────────────────────────────────────
+# Inference
+# ──────────────────────────────────────────────
+def cascade_predict_proba(student, champion, X_processed, threshold: float, rounds: int | None = None):
+    """
+    Scores every row with the student and escalates only rows whose top-1 probability
+    is below `threshold` to the champion. Returns (probas, escalated_mask).
+    """
+    probas = student.predict_proba(X_processed)
+    escalated = probas.max(axis=1) < threshold
+    if escalated.any():
+        probas[escalated] = champion.predict_proba(
+            X_processed[escalated], iteration_range=(0, rounds or 0)
+        )
+    return probas, escalated
+
+
+class CascadeStats:
+    """
+    Thread-safe running counters for the cascade and the plain champion path. Only
+    full-model calls are recorded, so the two rates stay comparable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cascade_rows = 0
+        self.escalated_rows = 0
+        self.cascade_seconds = 0.0
+        self.champion_rows = 0
+        self.champion_seconds = 0.0
+
+    def record(self, n_rows: int, seconds: float, escalated: int | None = None):
+        with self._lock:
+            if escalated is None:
+                self.champion_rows += n_rows
+                self.champion_seconds += seconds
+            else:
+                self.cascade_rows += n_rows
+                self.escalated_rows += escalated
+                self.cascade_seconds += seconds
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            cascade_rps = self.cascade_rows / self.cascade_seconds if self.cascade_seconds else None
+            champion_rps = self.champion_rows / self.champion_seconds if self.champion_seconds else None
+            return {
+                "cascade_rows": self.cascade_rows,
+                "escalated_rows": self.escalated_rows,
+                "escalation_rate": round(self.escalated_rows / self.cascade_rows, 4) if self.cascade_rows else None,
+                "cascade_rows_per_sec": round(cascade_rps, 1) if cascade_rps else None,
+                "champion_rows_per_sec": round(champion_rps, 1) if champion_rps else None,
+                "throughput_gain": round(cascade_rps / champion_rps, 2) if cascade_rps and champion_rps else None,
+            }
+
+
+# ──────────────────────────────────────────────
+# Offline Training & Threshold Calibration
+# ──────────────────────────────────────────────
+def _time_per_row(fn, X, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(X)
+
+
+def calibrate_threshold(student, champion, X_calib, y_calib, tolerance: float) -> dict:
+    """
+    Evaluates the whole threshold grid on the calibration rows and picks the threshold
+    with the fewest escalations whose cascade MCC stays within `tolerance` of the
+    champion's MCC (ties go to the higher MCC). MCC is not monotonic in the threshold,
+    so no point of the grid is skipped. Falls back to escalating every row.
+    """
+    student_probas = student.predict_proba(X_calib)
+    champion_preds = champion.predict_proba(X_calib).argmax(axis=1)
+    champion_mcc = matthews_corrcoef(y_calib, champion_preds)
+
+    top1 = student_probas.max(axis=1)
+    student_preds = student_probas.argmax(axis=1)
+    chosen = {"threshold": 1.01, "cascade_mcc": champion_mcc, "escalation_rate": 1.0}
+    # 0.0 never escalates; with 7 classes top-1 is at least 1/7, so that is the floor that matters
+    for threshold in np.round(np.arange(0.0, 1.0001, 0.01), 2):
+        escalated = top1 < threshold
+        mcc = matthews_corrcoef(y_calib, np.where(escalated, champion_preds, student_preds))
+        rate = float(escalated.mean())
+        if mcc < champion_mcc - tolerance:
+            continue
+        if (rate, -mcc) < (chosen["escalation_rate"], -chosen["cascade_mcc"]):
+            chosen = {"threshold": float(threshold), "cascade_mcc": mcc, "escalation_rate": rate}
+    chosen["champion_mcc"] = champion_mcc
+    return chosen
+
+
+def train_cascade(
+    data_path: str,
+    champion_path: str = "champion_xgboost.joblib",
+    preprocessor_path: str = "spatial_preprocessor.joblib",
+    out_path: str = CASCADE_PATH,
+    tolerance: float = 0.005,
+) -> dict:
+    """
+    Distills the champion into a shallow XGBoost student on the notebook's 80% train
+    split (student learns the champion's labels), calibrates the escalation threshold on
+    half of the 20% test split and reports MCC / throughput on the other half.
+    """
+    champion = joblib.load(champion_path)
+    preprocessor = joblib.load(preprocessor_path)
+
+    X, y = load_dataset(data_path)
+    X_train, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_calib, X_eval, y_calib, y_eval = train_test_split(X_test, y_test, test_size=0.5, random_state=42, stratify=y_test)
+
+    X_train_processed = preprocessor.transform(X_train)
+    X_calib_processed = preprocessor.transform(X_calib)
+    X_eval_processed = preprocessor.transform(X_eval)
+
+    print("Distilling champion into first-stage student...")
+    teacher_labels = champion.predict_proba(X_train_processed).argmax(axis=1)
+    student = xgb.XGBClassifier(**STUDENT_PARAMS)
+    student.fit(
+        X_train_processed, teacher_labels,
+        sample_weight=compute_sample_weight(class_weight="balanced", y=teacher_labels),
+    )
+
+    print(f"Calibrating escalation threshold (MCC tolerance {tolerance})...")
+    calibration = calibrate_threshold(student, champion, X_calib_processed, y_calib, tolerance)
+    threshold = calibration["threshold"]
+
+    # Held-out check on rows the threshold never saw
+    eval_probas, escalated = cascade_predict_proba(student, champion, X_eval_processed, threshold)
+    eval_mcc = matthews_corrcoef(y_eval, eval_probas.argmax(axis=1))
+    champion_eval_mcc = matthews_corrcoef(y_eval, champion.predict_proba(X_eval_processed).argmax(axis=1))
+
+    champion_spr = _time_per_row(champion.predict_proba, X_eval_processed)
+    cascade_spr = _time_per_row(
+        lambda X_: cascade_predict_proba(student, champion, X_, threshold), X_eval_processed
+    )
+
+    report = {
+        "threshold": threshold,
+        "tolerance": tolerance,
+        "escalation_rate": round(float(escalated.mean()), 4),
+        "champion_mcc": round(float(champion_eval_mcc), 4),
+        "cascade_mcc": round(float(eval_mcc), 4),
+        "throughput_gain": round(champion_spr / cascade_spr, 2),
+    }
+    joblib.dump({"model": student, **report}, out_path)
+
+    print("\n" + "=" * 50)
+    print("CASCADE CALIBRATION COMPLETE")
+    print("=" * 50)
+    print(f"Threshold:        {report['threshold']:.2f}")
+    print(f"Escalation rate:  {report['escalation_rate']:.1%}")
+    print(f"Champion MCC:     {report['champion_mcc']:.4f}")
+    print(f"Cascade MCC:      {report['cascade_mcc']:.4f}")
+    print(f"Throughput gain:  {report['throughput_gain']:.2f}x")
+    print(f"Saved to: {out_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and calibrate the first-stage cascade model.")
+    parser.add_argument("--data", default="covtype.csv", help="Path to the covtype CSV")
+    parser.add_argument("--champion", default="champion_xgboost.joblib")
+    parser.add_argument("--preprocessor", default="spatial_preprocessor.joblib")
+    parser.add_argument("--out", default=CASCADE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.005, help="Max allowed MCC drop vs the champion")
+    args = parser.parse_args()
+    train_cascade(args.data, args.champion, args.preprocessor, args.out, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
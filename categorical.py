@@ -0,0 +1,160 @@
+import argparse
+import io
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import matthews_corrcoef
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_sample_weight
+
+from features import build_categorical_preprocessor, load_dataset
+from training import XGB_CHAMPION_PARAMS
+
+# ──────────────────────────────────────────────
+# Native-Categorical Variant
+# ──────────────────────────────────────────────
+# The champion splits the 44 Wilderness/Soil flags one at a time. This variant feeds
+# them to XGBoost as two categoricals, so a single node can send any subset of soil
+# types left or right. Serve it with FOREST_MODEL_VARIANT=categorical.
+CATEGORICAL_MODEL_PATH = "champion_xgboost_categorical.joblib"
+CATEGORICAL_PREPROCESSOR_PATH = "spatial_preprocessor_categorical.joblib"
+
+XGB_CATEGORICAL_PARAMS = {
+    **XGB_CHAMPION_PARAMS,
+    "enable_categorical": True,
+    # Always use partition-based splits, never one-hot within the tree
+    "max_cat_to_onehot": 1,
+}
+
+
+def _tree_structure(model) -> dict:
+    """Tree count, total nodes, leaves per tree and the deepest leaf."""
+    trees = model.get_booster().trees_to_dataframe()
+    depth = {}
+    for tree, node, yes, no in trees[["Tree", "Node", "Yes", "No"]].itertuples(index=False):
+        d = depth.get((tree, node), 0)
+        depth[(tree, node)] = d
+        if isinstance(yes, str):
+            depth[(tree, int(yes.split("-")[1]))] = d + 1
+            depth[(tree, int(no.split("-")[1]))] = d + 1
+    n_trees = trees["Tree"].nunique()
+    leaves = int((trees["Feature"] == "Leaf").sum())
+    return {
+        "trees": int(n_trees),
+        "nodes": int(len(trees)),
+        "leaves_per_tree": round(leaves / n_trees, 1),
+        "max_depth": int(max(depth.values())),
+    }
+
+
+def _size_mb(obj) -> float:
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.tell() / (1024 * 1024)
+
+
+def _p99_single_row_ms(fn, rows: list) -> float:
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.percentile(timings, 99) * 1000)
+
+
+def _rows(X, n: int) -> list:
+    return [X.iloc[[i]] if isinstance(X, pd.DataFrame) else X[i:i + 1] for i in range(min(n, len(X)))]
+
+
+def compare_models(candidates: dict, X_test: pd.DataFrame, y_test, latency_rows: int = 1000) -> pd.DataFrame:
+    """
+    `candidates` maps a label to (model, preprocessor). Reports footprint, tree shape,
+    p99 single-row latency (model only and raw row -> prediction), batch throughput and
+    held-out MCC.
+    """
+    report = []
+    for label, (model, preprocessor) in candidates.items():
+        X_processed = preprocessor.transform(X_test)
+        start = time.perf_counter()
+        preds = model.predict_proba(X_processed).argmax(axis=1)
+        batch_s = time.perf_counter() - start
+
+        model_rows = _rows(X_processed, latency_rows)
+        raw_rows = _rows(X_test, latency_rows)
+        report.append({
+            "model": label,
+            "size_mb": round(_size_mb(model), 2),
+            **_tree_structure(model),
+            "p99_model_ms": round(_p99_single_row_ms(model.predict_proba, model_rows), 3),
+            "p99_pipeline_ms": round(
+                _p99_single_row_ms(lambda row: model.predict_proba(preprocessor.transform(row)), raw_rows), 3
+            ),
+            "batch_rows_per_sec": round(len(X_test) / batch_s),
+            "mcc": round(float(matthews_corrcoef(y_test, preds)), 4),
+        })
+    return pd.DataFrame(report)
+
+
+# ──────────────────────────────────────────────
+# CLI: train the variant and compare it with the champion
+# ──────────────────────────────────────────────
+def train_categorical(data_path: str, out_model: str, out_preprocessor: str, overrides: dict):
+    """
+    Fits the categorical preprocessor and model on the notebook's 80% split, with the
+    same balanced sample weights as the champion. Returns (model, preprocessor, X_test, y_test).
+    """
+    X, y = load_dataset(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    preprocessor = build_categorical_preprocessor()
+    X_train_processed = preprocessor.fit_transform(X_train)
+
+    params = {**XGB_CATEGORICAL_PARAMS, **{k: v for k, v in overrides.items() if v is not None}}
+    print(f"Training categorical variant (max_depth={params['max_depth']}, n_estimators={params['n_estimators']})...")
+    model = xgb.XGBClassifier(**params)
+    model.fit(X_train_processed, y_train, sample_weight=compute_sample_weight(class_weight="balanced", y=y_train))
+
+    joblib.dump(model, out_model)
+    joblib.dump(preprocessor, out_preprocessor)
+    print(f"Saved {out_model} and {out_preprocessor}")
+    return model, preprocessor, X_test, y_test
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the native-categorical variant and compare it with the champion.")
+    parser.add_argument("--data", default="covtype.csv", help="Path to the covtype CSV")
+    parser.add_argument("--champion", default="champion_xgboost.joblib")
+    parser.add_argument("--preprocessor", default="spatial_preprocessor.joblib")
+    parser.add_argument("--out-model", default=CATEGORICAL_MODEL_PATH)
+    parser.add_argument("--out-preprocessor", default=CATEGORICAL_PREPROCESSOR_PATH)
+    parser.add_argument("--max-depth", type=int, default=None, help="Override the champion's max_depth")
+    parser.add_argument("--n-estimators", type=int, default=None, help="Override the champion's n_estimators")
+    parser.add_argument("--device", default=None, help="e.g. cuda")
+    parser.add_argument("--compare-only", action="store_true", help="Skip training and compare the saved variant")
+    parser.add_argument("--latency-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.compare_only:
+        X, y = load_dataset(args.data)
+        _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        variant = (joblib.load(args.out_model), joblib.load(args.out_preprocessor))
+    else:
+        overrides = {"max_depth": args.max_depth, "n_estimators": args.n_estimators, "device": args.device}
+        model, preprocessor, X_test, y_test = train_categorical(args.data, args.out_model, args.out_preprocessor, overrides)
+        variant = (model, preprocessor)
+
+    candidates = {"one-hot champion": (joblib.load(args.champion), joblib.load(args.preprocessor))}
+    candidates["native categorical"] = variant
+    report = compare_models(candidates, X_test, y_test, args.latency_rows)
+
+    print("\n" + "=" * 50)
+    print("ONE-HOT vs NATIVE CATEGORICAL")
+    print("=" * 50)
+    print(report.set_index("model").T.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from features import RAW_CONTINUOUS_FEATURES, RAW_FEATURES, SOIL_FEATURES, TARGET, WILDERNESS_FEATURES
+
+# ──────────────────────────────────────────────
+# Drift Monitoring
+# ──────────────────────────────────────────────
+# The baseline stores, per continuous input, decile cut points from the training split
+# and the share of training rows in each bin; plus one-hot frequencies and the class
+# mix. The live monitor keeps only fixed-size counters (bins, moments, one-hot counts),
+# so memory is constant no matter how much traffic it has seen.
+BASELINE_PATH = "drift_baseline.json"
+N_QUANTILE_BINS = 10
+PSI_EPS = 1e-4
+
+# Conventional PSI reading: < 0.1 stable, 0.1–0.25 moderate shift, > 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+
+def psi(expected, actual) -> float:
+    """Population Stability Index between two proportion vectors."""
+    e = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPS, None)
+    a = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _psi_level(value: float) -> str:
+    if value >= PSI_MAJOR:
+        return "major"
+    if value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+# ──────────────────────────────────────────────
+# Baseline (built offline from the training split)
+# ──────────────────────────────────────────────
+def build_baseline(X_raw: pd.DataFrame, y: pd.Series) -> dict:
+    """
+    Builds the drift baseline from raw training inputs and their 1–7 labels.
+    """
+    continuous = {}
+    for col in RAW_CONTINUOUS_FEATURES:
+        values = X_raw[col].to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, N_QUANTILE_BINS + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        continuous[col] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / len(values)).tolist(),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+
+    class_counts = np.bincount(np.asarray(y, dtype=np.int64) - 1, minlength=7)
+    return {
+        "n_rows": int(len(X_raw)),
+        "continuous": continuous,
+        "wilderness": (X_raw[WILDERNESS_FEATURES].to_numpy().sum(axis=0) / len(X_raw)).tolist(),
+        "soil": (X_raw[SOIL_FEATURES].to_numpy().sum(axis=0) / len(X_raw)).tolist(),
+        "class_mix": (class_counts / class_counts.sum()).tolist(),
+    }
+
+
+def save_baseline(baseline: dict, path: str = BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+# ──────────────────────────────────────────────
+# Streaming Monitor (constant memory, vectorized per batch)
+# ──────────────────────────────────────────────
+class DriftMonitor:
+    """
+    Accumulates live inputs and predicted classes against a baseline. `update()` does a
+    handful of NumPy reductions per batch; all state is fixed-size arrays.
+    """
+
+    def __init__(self, baseline: dict):
+        self.baseline = baseline
+        self.features = list(RAW_CONTINUOUS_FEATURES)
+        self.edges = [np.asarray(baseline["continuous"][f]["edges"]) for f in self.features]
+        # Edges padded to a common width with +inf, so one broadcast comparison bins
+        # every feature at once; bin j of feature f lands at flat index f * width + j
+        width = max(len(e) for e in self.edges) + 1
+        self._padded_edges = np.full((len(self.features), width - 1), np.inf)
+        for j, e in enumerate(self.edges):
+            self._padded_edges[j, :len(e)] = e
+        self._bin_offsets = np.arange(len(self.features)) * width
+        self._bin_width = width
+        self.train_min = np.array([baseline["continuous"][f]["min"] for f in self.features])
+        self.train_max = np.array([baseline["continuous"][f]["max"] for f in self.features])
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.n = 0
+            self.mean = np.zeros(len(self.features))
+            self.m2 = np.zeros(len(self.features))
+            self.bin_counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in self.edges]
+            self.below_min = np.zeros(len(self.features), dtype=np.int64)
+            self.above_max = np.zeros(len(self.features), dtype=np.int64)
+            self.wilderness_counts = np.zeros(len(WILDERNESS_FEATURES), dtype=np.int64)
+            self.soil_counts = np.zeros(len(SOIL_FEATURES), dtype=np.int64)
+            self.class_counts = np.zeros(7, dtype=np.int64)
+
+    def update(self, df_raw: pd.DataFrame, raw_preds: np.ndarray):
+        """Folds one batch of raw inputs and 0-indexed predicted classes into the sketches."""
+        # One column reindex for the whole batch (skipped when already in API order);
+        # everything below works on NumPy slices
+        if list(df_raw.columns) != RAW_FEATURES:
+            df_raw = df_raw.reindex(columns=RAW_FEATURES, fill_value=0)
+        values = df_raw.to_numpy(dtype=np.float64)
+        n_b = len(values)
+        if n_b == 0:
+            return
+        n_cont, n_wild = len(RAW_CONTINUOUS_FEATURES), len(WILDERNESS_FEATURES)
+        X = values[:, :n_cont]
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        bin_idx = (X[:, :, None] >= self._padded_edges[None]).sum(axis=2) + self._bin_offsets
+        bins = np.bincount(bin_idx.ravel(), minlength=len(self.features) * self._bin_width)
+        bins = bins.reshape(len(self.features), self._bin_width)
+        below = (X < self.train_min).sum(axis=0)
+        above = (X > self.train_max).sum(axis=0)
+        wilderness = values[:, n_cont:n_cont + n_wild].sum(axis=0)
+        soil = values[:, n_cont + n_wild:].sum(axis=0)
+        classes = np.bincount(np.asarray(raw_preds, dtype=np.int64), minlength=7)
+
+        with self._lock:
+            # Chan et al. parallel merge of (count, mean, M2)
+            n_a = self.n
+            n = n_a + n_b
+            delta = batch_mean - self.mean
+            self.mean = self.mean + delta * (n_b / n)
+            self.m2 = self.m2 + batch_m2 + delta ** 2 * (n_a * n_b / n)
+            self.n = n
+            for j, counts in enumerate(self.bin_counts):
+                counts += bins[j, :len(counts)]
+            self.below_min += below
+            self.above_max += above
+            self.wilderness_counts += wilderness.astype(np.int64)
+            self.soil_counts += soil.astype(np.int64)
+            self.class_counts += classes
+
+    def report(self) -> dict:
+        """PSI per feature / one-hot group / predicted class mix, plus moment shifts."""
+        with self._lock:
+            n = self.n
+            if n == 0:
+                return {"rows_observed": 0, "features": {}, "wilderness": None, "soil": None, "class_mix": None}
+
+            features = {}
+            std = np.sqrt(self.m2 / n)
+            for j, feature in enumerate(self.features):
+                base = self.baseline["continuous"][feature]
+                value = psi(base["proportions"], self.bin_counts[j] / n)
+                features[feature] = {
+                    "psi": round(value, 4),
+                    "level": _psi_level(value),
+                    "mean": round(float(self.mean[j]), 3),
+                    "std": round(float(std[j]), 3),
+                    "mean_shift_in_train_std": round(float((self.mean[j] - base["mean"]) / (base["std"] or 1.0)), 3),
+                    "below_train_min": round(float(self.below_min[j] / n), 4),
+                    "above_train_max": round(float(self.above_max[j] / n), 4),
+                }
+
+            soil_share = self.soil_counts / n
+            unseen_soil = [
+                SOIL_FEATURES[i] for i, (live, base) in enumerate(zip(soil_share, self.baseline["soil"]))
+                if live > 0 and base == 0
+            ]
+            wilderness_psi = psi(self.baseline["wilderness"], self.wilderness_counts / n)
+            soil_psi = psi(self.baseline["soil"], soil_share)
+            class_psi = psi(self.baseline["class_mix"], self.class_counts / n)
+
+            return {
+                "rows_observed": int(n),
+                "features": features,
+                "wilderness": {"psi": round(wilderness_psi, 4), "level": _psi_level(wilderness_psi)},
+                "soil": {"psi": round(soil_psi, 4), "level": _psi_level(soil_psi), "unseen_in_training": unseen_soil},
+                "class_mix": {
+                    "psi": round(class_psi, 4),
+                    "level": _psi_level(class_psi),
+                    "live": (self.class_counts / n).round(4).tolist(),
+                    "baseline": [round(p, 4) for p in self.baseline["class_mix"]],
+                },
+            }
+
+
+# ──────────────────────────────────────────────
+# CLI: build the baseline from the training split
+# ──────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Build the drift baseline from the notebook's training split.")
+    parser.add_argument("--data", default="covtype.csv", help="Path to the covtype CSV")
+    parser.add_argument("--out", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    train_df, _ = train_test_split(df, test_size=0.2, random_state=42, stratify=df[TARGET])
+    save_baseline(build_baseline(train_df, train_df[TARGET]), args.out)
+    print(f"Drift baseline built from {len(train_df):,} training rows -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import gzip
+import io
+import json
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ──────────────────────────────────────────────
+# Response Encodings
+# ──────────────────────────────────────────────
+# Chosen per request from `Accept` / `Accept-Encoding`:
+#   application/json                     the existing per-row JSON (default)
+#   application/msgpack                  columnar MessagePack; ids and probabilities as raw bytes
+#   application/x-forest-matrix          12-byte header + uint8 class ids + probability matrix
+# Both binary types take a `dtype=float16|float32` parameter (default float32), and any
+# body of at least MIN_COMPRESS_BYTES is compressed with zstd or gzip when accepted.
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_MATRIX = "application/x-forest-matrix"
+MSGPACK_ALIASES = {MEDIA_MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+MIN_COMPRESS_BYTES = 1024
+
+# magic, version, probability itemsize (2 or 4), n_classes, n_rows — little-endian
+MATRIX_HEADER = struct.Struct("<4sBBHI")
+MATRIX_MAGIC = b"FCPM"
+MATRIX_VERSION = 1
+
+
+def _parse_header_list(header: str | None) -> list[tuple[str, dict, float]]:
+    """Splits an Accept-style header into (value, params, q), highest q first."""
+    items = []
+    for position, part in enumerate((header or "").split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        if not fields[0]:
+            continue
+        params = {}
+        for field in fields[1:]:
+            key, _, value = field.partition("=")
+            params[key.strip().lower()] = value.strip().strip('"')
+        try:
+            q = float(params.pop("q", 1.0))
+        except ValueError:
+            q = 0.0
+        items.append((fields[0].lower(), params, q, position))
+    items.sort(key=lambda item: (-item[2], item[3]))
+    return [(value, params, q) for value, params, q, _ in items if q > 0]
+
+
+def negotiate_media(accept: str | None) -> tuple[str, np.dtype]:
+    """
+    Picks the response media type and probability dtype. Unknown or wildcard types fall
+    back to JSON, so existing clients are unaffected.
+    """
+    for media, params, _ in _parse_header_list(accept):
+        if media in MSGPACK_ALIASES:
+            media = MEDIA_MSGPACK
+        elif media != MEDIA_MATRIX:
+            if media in (MEDIA_JSON, "application/*", "*/*"):
+                return MEDIA_JSON, DTYPES["float32"]
+            continue
+        dtype_name = params.get("dtype", "float32")
+        if dtype_name not in DTYPES:
+            raise HTTPException(status_code=406, detail=f"Unsupported dtype '{dtype_name}'. Use float16 or float32.")
+        if media == MEDIA_MSGPACK and msgpack is None:
+            raise HTTPException(status_code=406, detail="MessagePack responses need the `msgpack` package on the server.")
+        return media, DTYPES[dtype_name]
+    return MEDIA_JSON, DTYPES["float32"]
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """zstd if accepted and available, else gzip if accepted, else no compression."""
+    accepted = {value for value, _, _ in _parse_header_list(accept_encoding)}
+    if zstandard is not None and ("zstd" in accepted or "*" in accepted):
+        return "zstd"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+# ──────────────────────────────────────────────
+# Encoders (straight from the NumPy outputs)
+# ──────────────────────────────────────────────
+def encode_matrix(cover_type_ids: np.ndarray, probas: np.ndarray, dtype: np.dtype) -> bytes:
+    n_rows, n_classes = probas.shape
+    header = MATRIX_HEADER.pack(MATRIX_MAGIC, MATRIX_VERSION, dtype.itemsize, n_classes, n_rows)
+    return b"".join((
+        header,
+        np.ascontiguousarray(cover_type_ids, dtype=np.uint8).tobytes(),
+        np.ascontiguousarray(probas, dtype=dtype).tobytes(),
+    ))
+
+
+def decode_matrix(body: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Inverse of `encode_matrix`: (1-based class ids, probabilities as float32)."""
+    magic, version, itemsize, n_classes, n_rows = MATRIX_HEADER.unpack_from(body)
+    if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+        raise ValueError("Not a forest probability matrix (bad magic/version).")
+    offset = MATRIX_HEADER.size
+    ids = np.frombuffer(body, dtype=np.uint8, count=n_rows, offset=offset)
+    dtype = DTYPES["float16"] if itemsize == 2 else DTYPES["float32"]
+    probas = np.frombuffer(body, dtype=dtype, count=n_rows * n_classes, offset=offset + n_rows)
+    return ids, probas.reshape(n_rows, n_classes).astype(np.float32)
+
+
+def batch_msgpack(meta: dict, class_names: list[str], cover_type_ids: np.ndarray, probas: np.ndarray,
+                  dtype: np.dtype, explanations: list[dict] | None = None) -> bytes:
+    """Columnar MessagePack: the batch metadata plus ids / probabilities as raw little-endian bytes."""
+    payload = {
+        **meta,
+        "class_names": class_names,
+        "dtype": dtype.name,
+        "shape": list(probas.shape),
+        "cover_type_ids": np.ascontiguousarray(cover_type_ids, dtype=np.uint8).tobytes(),
+        "probabilities": np.ascontiguousarray(probas, dtype=dtype).tobytes(),
+    }
+    if explanations is not None:
+        payload["explanations"] = explanations
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def decode_batch_msgpack(body: bytes) -> tuple[dict, np.ndarray, np.ndarray]:
+    """Inverse of `batch_msgpack`: (payload, 1-based class ids, probabilities as float32)."""
+    payload = msgpack.unpackb(body, raw=False)
+    ids = np.frombuffer(payload["cover_type_ids"], dtype=np.uint8)
+    probas = np.frombuffer(payload["probabilities"], dtype=DTYPES[payload["dtype"]]).reshape(payload["shape"])
+    return payload, ids, probas.astype(np.float32)
+
+
+def encode_msgpack(obj) -> bytes:
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def compress(body: bytes, encoding: str | None) -> tuple[bytes, str | None]:
+    """Compresses `body` unless it is too small to be worth it; returns (body, encoding used)."""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=5), "gzip"
+
+
+def encoded_response(body: bytes, media_type: str, accept_encoding: str | None, headers: dict | None = None) -> Response:
+    body, used = compress(body, negotiate_encoding(accept_encoding))
+    headers = {k: str(v) for k, v in (headers or {}).items() if v is not None}
+    headers["Vary"] = "Accept, Accept-Encoding"
+    if used:
+        headers["Content-Encoding"] = used
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# ──────────────────────────────────────────────
+# CLI: payload bytes and end-to-end time per encoding
+# ──────────────────────────────────────────────
+BENCH_VARIANTS = [
+    ("json", MEDIA_JSON, "identity"),
+    ("json + gzip", MEDIA_JSON, "gzip"),
+    ("json + zstd", MEDIA_JSON, "zstd"),
+    ("msgpack f32", MEDIA_MSGPACK, "identity"),
+    ("msgpack f32 + zstd", MEDIA_MSGPACK, "zstd"),
+    ("matrix f32", MEDIA_MATRIX, "identity"),
+    ("matrix f16", f"{MEDIA_MATRIX}; dtype=float16", "identity"),
+    ("matrix f16 + zstd", f"{MEDIA_MATRIX}; dtype=float16", "zstd"),
+]
+
+
+def _decode_for_bench(media: str, body: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """What a client has to do to get (ids, probas) arrays out of each format."""
+    if media.startswith(MEDIA_MATRIX):
+        return decode_matrix(body)
+    if media == MEDIA_MSGPACK:
+        _, ids, probas = decode_batch_msgpack(body)
+        return ids, probas
+    preds = json.loads(body)["predictions"]
+    ids = np.array([p["cover_type_id"] for p in preds], dtype=np.uint8)
+    probas = np.array([list(p["probabilities"].values()) for p in preds], dtype=np.float32)
+    return ids, probas
+
+
+def _decompress(body: bytes, content_encoding: str | None) -> bytes:
+    if content_encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    if content_encoding == "gzip":
+        return gzip.decompress(body)
+    return body
+
+
+def benchmark(url: str, df: pd.DataFrame, repeats: int) -> pd.DataFrame:
+    import requests
+
+    csv_bytes = df.to_csv(index=False).encode("utf-8")
+    session = requests.Session()
+    rows = []
+    for label, accept, accept_encoding in BENCH_VARIANTS:
+        timings, wire_bytes = [], 0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            r = session.post(
+                f"{url}/predict/batch",
+                files={"file": ("batch.csv", io.BytesIO(csv_bytes), "text/csv")},
+                headers={"Accept": accept, "Accept-Encoding": accept_encoding},
+                stream=True,
+            )
+            r.raise_for_status()
+            raw = r.raw.read(decode_content=False)
+            ids, _ = _decode_for_bench(accept, _decompress(raw, r.headers.get("Content-Encoding")))
+            timings.append(time.perf_counter() - start)
+            wire_bytes = len(raw)
+        assert len(ids) == len(df)
+        rows.append({"encoding": label, "bytes": wire_bytes, "median_ms": float(np.median(timings) * 1000)})
+
+    report = pd.DataFrame(rows)
+    report["bytes_vs_json"] = report["bytes"] / report.loc[0, "bytes"]
+    report["time_vs_json"] = report["median_ms"] / report.loc[0, "median_ms"]
+    print(report.round(3).to_string(index=False))
+    return report
+
+
+def main():
+    from forest_client.benchmark import spawn_server, synthetic_rows
+
+    parser = argparse.ArgumentParser(description="Compare /predict/batch payload size and end-to-end time per encoding.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", default=None, help="CSV to score (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).drop(columns=["Cover_Type"], errors="ignore").head(args.rows) if args.data else synthetic_rows(args.rows)
+    url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+    proc = spawn_server(args.port, 1) if args.spawn else None
+    try:
+        benchmark(url, df, args.repeats)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
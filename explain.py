@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from features import PROCESSED_FEATURES, RAW_FEATURES, TARGET, engineer_features
+
+# ──────────────────────────────────────────────
+# Per-Prediction Explanations (TreeSHAP)
+# ──────────────────────────────────────────────
+# XGBoost's native `pred_contribs` gives exact TreeSHAP values in margin space:
+# for every class, one contribution per preprocessed feature plus a bias term, summing
+# to that class's raw score. Rows are cached by the number of boosting rounds used plus
+# a hash of their raw input values.
+
+
+def feature_names_for(preprocessor) -> list[str]:
+    """Preprocessor output column names without the ColumnTransformer prefixes."""
+    # The categorical variant is a Pipeline whose last step names the output columns
+    final = preprocessor.steps[-1][1] if hasattr(preprocessor, "steps") else preprocessor
+    try:
+        return [name.split("__", 1)[-1] for name in final.get_feature_names_out()]
+    except Exception:
+        return list(PROCESSED_FEATURES)
+
+
+def row_keys(df_raw: pd.DataFrame) -> list[bytes]:
+    """Stable per-row hash of the 54 raw inputs (column order fixed, values as float64)."""
+    values = np.ascontiguousarray(df_raw.reindex(columns=RAW_FEATURES, fill_value=0).to_numpy(dtype=np.float64))
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in values]
+
+
+class ContributionExplainer:
+    """
+    Thread-safe LRU cache in front of `Booster.predict(..., pred_contribs=True)`.
+    Only cache misses are sent to XGBoost, in a single batched call.
+    """
+
+    def __init__(self, model, feature_names: list[str], cache_size: int = 4096):
+        self.booster = model.get_booster()
+        self.total_rounds = self.booster.num_boosted_rounds()
+        self.feature_names = feature_names
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def contributions(self, X_processed, keys: list[bytes], rounds: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (contribs, cached): contribs has shape (n_rows, n_classes, n_features + 1),
+        bias last; `cached` flags rows served from the cache.
+
+        `rounds` explains the model truncated to its first `rounds` boosting rounds (as
+        served with `iteration_range`), so bias + contributions still sum to the raw
+        score behind the returned probabilities. None means every round.
+        """
+        rounds = 0 if rounds is None or rounds >= self.total_rounds else rounds
+        keys = [(rounds, k) for k in keys]
+        with self._lock:
+            found = [self._cache.get(k) for k in keys]
+            for k, hit in zip(keys, found):
+                if hit is not None:
+                    self._cache.move_to_end(k)
+        cached = np.array([f is not None for f in found], dtype=bool)
+        missing = np.flatnonzero(~cached)
+
+        if len(missing):
+            if isinstance(X_processed, pd.DataFrame):
+                # Categorical variant: keep the category dtype for XGBoost
+                dmatrix = xgb.DMatrix(X_processed.iloc[missing], enable_categorical=True)
+            else:
+                dmatrix = xgb.DMatrix(X_processed[missing])
+            computed = self.booster.predict(dmatrix, pred_contribs=True, iteration_range=(0, rounds))
+            with self._lock:
+                for idx, contrib in zip(missing, computed):
+                    found[idx] = contrib
+                    self._cache[keys[idx]] = contrib
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        with self._lock:
+            self.hits += int(cached.sum())
+            self.misses += len(missing)
+        return np.stack(found), cached
+
+    def explain_rows(self, contribs: np.ndarray, classes: np.ndarray, top_k: int | None = None) -> list[dict]:
+        """
+        Per-row {feature: contribution} for the given (0-indexed) class of each row,
+        ordered by absolute contribution, optionally truncated to the top k.
+        """
+        picked = contribs[np.arange(len(classes)), classes]          # (n_rows, n_features + 1)
+        bias, values = picked[:, -1], picked[:, :-1]
+        order = np.argsort(-np.abs(values), axis=1)
+        if top_k is not None:
+            order = order[:, :top_k]
+        return [
+            {
+                "bias": round(float(b), 4),
+                "contributions": {self.feature_names[j]: round(float(row[j]), 4) for j in idx},
+            }
+            for b, row, idx in zip(bias, values, order)
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"cache_entries": len(self._cache), "cache_size": self.cache_size, "hits": self.hits, "misses": self.misses}
+
+
+# ──────────────────────────────────────────────
+# CLI: latency of explanations vs plain prediction
+# ──────────────────────────────────────────────
+def _median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def benchmark(data_path: str, model_path: str, preprocessor_path: str, batch_rows: int, repeats: int) -> pd.DataFrame:
+    model = joblib.load(model_path)
+    preprocessor = joblib.load(preprocessor_path)
+    df_raw = pd.read_csv(data_path, nrows=batch_rows).drop(columns=[TARGET], errors="ignore")
+    X = preprocessor.transform(engineer_features(df_raw))
+    keys = row_keys(df_raw)
+
+    rows = []
+    for label, X_, keys_ in (("single row", X[:1], keys[:1]), (f"batch of {len(X):,}", X, keys)):
+        explainer = ContributionExplainer(model, feature_names_for(preprocessor), cache_size=len(keys) + 1)
+        predict_ms = _median_ms(lambda: model.predict_proba(X_), repeats)
+        # A fresh cache per repeat measures the cold path
+        cold_ms = _median_ms(
+            lambda: ContributionExplainer(model, explainer.feature_names).contributions(X_, keys_), repeats
+        )
+        explainer.contributions(X_, keys_)
+        warm_ms = _median_ms(lambda: explainer.contributions(X_, keys_), repeats)
+        rows.append({
+            "input": label,
+            "predict_ms": predict_ms,
+            "explain_cold_ms": cold_ms,
+            "explain_cached_ms": warm_ms,
+            "cold_overhead_x": cold_ms / predict_ms,
+        })
+
+    report = pd.DataFrame(rows)
+    print(report.round(3).to_string(index=False))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TreeSHAP explanations against plain prediction.")
+    parser.add_argument("--data", default="holdout.csv", help="CSV with the raw input columns")
+    parser.add_argument("--model", default="champion_xgboost.joblib")
+    parser.add_argument("--preprocessor", default="spatial_preprocessor.joblib")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.data, args.model, args.preprocessor, args.rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,30 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
 import joblib
+import atexit
 import io
+import os
+import time
+
+from features import RAW_CONTINUOUS_FEATURES, RAW_FEATURES, TARGET, engineer_features
+from audit import AuditSink
+from cascade import CascadeStats, cascade_predict_proba
+from drift import DriftMonitor, load_baseline
+from encoding import (
+    MEDIA_JSON, MEDIA_MATRIX, MEDIA_MSGPACK,
+    batch_msgpack, encode_matrix, encode_msgpack, encoded_response, negotiate_media,
+)
+from explain import ContributionExplainer, feature_names_for, row_keys
+from iteration_curve import build_iteration_curve
+from shadow import ShadowScorer
+from streaming import (
+    COMPACT_FEATURES, MAX_FRAME_ROWS, PHYSICAL_BOUNDS, StreamStats, input_bounds, serve_stream,
+)
 
 # ──────────────────────────────────────────────
 # App Setup
@@ -20,20 +40,121 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Process-Time-Ms", "X-Total-Rows", "X-Rounds-Used", "X-Expected-MCC", "X-Escalated-Rows"],
 )
 
+
+@app.middleware("http")
+async def add_process_time_header(request, call_next):
+    # Server-side latency, so clients can separate it from network round-trip time
+    start = time.perf_counter()
+    response = await call_next(request)
+    response.headers["X-Process-Time-Ms"] = f"{(time.perf_counter() - start) * 1000:.2f}"
+    return response
+
 # ──────────────────────────────────────────────
 # Model & Preprocessor Loading
 # ──────────────────────────────────────────────
+# FOREST_MODEL_VARIANT=categorical serves the native-categorical model from `categorical.py`
+MODEL_VARIANTS = {
+    "onehot": ("champion_xgboost.joblib", "spatial_preprocessor.joblib"),
+    "categorical": ("champion_xgboost_categorical.joblib", "spatial_preprocessor_categorical.joblib"),
+}
+MODEL_VARIANT = os.getenv("FOREST_MODEL_VARIANT", "onehot")
+if MODEL_VARIANT not in MODEL_VARIANTS:
+    print(f" Unknown FOREST_MODEL_VARIANT '{MODEL_VARIANT}', using onehot.")
+    MODEL_VARIANT = "onehot"
+MODEL_PATH, PREPROCESSOR_PATH = MODEL_VARIANTS[MODEL_VARIANT]
 try:
-    model = joblib.load("champion_xgboost.joblib")
-    preprocessor = joblib.load("spatial_preprocessor.joblib")
-    print(" Model and preprocessor loaded successfully.")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    print(f" Model and preprocessor loaded successfully ({MODEL_VARIANT} variant).")
 except Exception as e:
     model = None
     preprocessor = None
     print(f" Could not load model/preprocessor: {e}")
 
+# Accuracy-vs-iteration curve for latency-budgeted requests. Scored on the held-out
+# sample exported by `iteration_curve.py`; without it only latencies are known.
+HOLDOUT_PATH = os.getenv("FOREST_HOLDOUT_CSV", "holdout.csv")
+iteration_curve = None
+if model is not None and preprocessor is not None:
+    try:
+        if os.path.exists(HOLDOUT_PATH):
+            df_holdout = pd.read_csv(HOLDOUT_PATH)
+            X_holdout = preprocessor.transform(engineer_features(df_holdout.drop(columns=[TARGET])))
+            iteration_curve = build_iteration_curve(model, X_holdout, df_holdout[TARGET].to_numpy() - 1)
+        else:
+            iteration_curve = build_iteration_curve(model)
+        print(f" Iteration curve ready ({iteration_curve.total_rounds} rounds).")
+    except Exception as e:
+        print(f" Could not build iteration curve: {e}")
+
+# Optional first-stage model for `?cascade=true` (trained by `cascade.py`)
+CASCADE_PATH = os.getenv("FOREST_CASCADE_PATH", "cascade_student.joblib")
+cascade_artifact = None
+try:
+    if os.path.exists(CASCADE_PATH):
+        cascade_artifact = joblib.load(CASCADE_PATH)
+        # The student must have been distilled against the same preprocessor as the model
+        if model is not None and cascade_artifact["model"].n_features_in_ != model.n_features_in_:
+            print(f" Cascade student expects {cascade_artifact['model'].n_features_in_} features, "
+                  f"the {MODEL_VARIANT} model {model.n_features_in_}; retrain it with cascade.py.")
+            cascade_artifact = None
+        else:
+            print(f" Cascade student loaded (threshold {cascade_artifact['threshold']:.2f}).")
+except Exception as e:
+    print(f" Could not load cascade student: {e}")
+cascade_stats = CascadeStats()
+stream_stats = StreamStats()
+
+# Optional shadow candidate (e.g. a retrained champion), scored off the request path on
+# the same preprocessed batches. It must share the serving preprocessor.
+SHADOW_MODEL_PATH = os.getenv("FOREST_SHADOW_MODEL")
+shadow = None
+if SHADOW_MODEL_PATH and model is not None:
+    try:
+        candidate = joblib.load(SHADOW_MODEL_PATH)
+        if candidate.n_features_in_ != model.n_features_in_:
+            print(f" Shadow model expects {candidate.n_features_in_} features, the {MODEL_VARIANT} preprocessor "
+                  f"produces {model.n_features_in_}; shadow mode disabled.")
+        else:
+            shadow = ShadowScorer(candidate, max_pending_rows=int(os.getenv("FOREST_SHADOW_MAX_PENDING", "50000")))
+            print(f" Shadow model loaded ({SHADOW_MODEL_PATH}).")
+    except Exception as e:
+        print(f" Could not load shadow model: {e}")
+
+# Per-prediction TreeSHAP contributions, cached by input hash
+explainer = None
+if model is not None and preprocessor is not None:
+    explainer = ContributionExplainer(model, feature_names_for(preprocessor))
+
+# Input-drift / prediction-mix monitor against the training baseline built by `drift.py`
+DRIFT_BASELINE_PATH = os.getenv("FOREST_DRIFT_BASELINE", "drift_baseline.json")
+drift_monitor = None
+try:
+    if os.path.exists(DRIFT_BASELINE_PATH):
+        drift_monitor = DriftMonitor(load_baseline(DRIFT_BASELINE_PATH))
+        print(f" Drift baseline loaded ({drift_monitor.baseline['n_rows']:,} training rows).")
+except Exception as e:
+    print(f" Could not load drift baseline: {e}")
+
+# Optional audit log of every input/output, written off the request path. Enabled by
+# pointing FOREST_AUDIT_DIR at a directory; FOREST_AUDIT_FORMAT is sqlite or parquet.
+AUDIT_DIR = os.getenv("FOREST_AUDIT_DIR")
+audit_sink = None
+if AUDIT_DIR:
+    try:
+        audit_sink = AuditSink(
+            AUDIT_DIR,
+            fmt=os.getenv("FOREST_AUDIT_FORMAT", "sqlite"),
+            capacity_rows=int(os.getenv("FOREST_AUDIT_CAPACITY", "100000")),
+        )
+        atexit.register(audit_sink.close)
+        print(f" Audit log enabled ({audit_sink.fmt} files in {AUDIT_DIR}).")
+    except Exception as e:
+        print(f" Could not enable audit log: {e}")
+
 # ──────────────────────────────────────────────
 # Constants
 # ──────────────────────────────────────────────
@@ -48,31 +169,6 @@ COVER_TYPES = {
 }
 
 
-# ──────────────────────────────────────────────
-# Feature Engineering  (mirrors notebook exactly)
-# ──────────────────────────────────────────────
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
-    df_eng = df.copy()
-    df_eng["Euclidean_Distance_To_Hydrology"] = np.sqrt(
-        df_eng["Horizontal_Distance_To_Hydrology"] ** 2
-        + df_eng["Vertical_Distance_To_Hydrology"] ** 2
-    )
-    df_eng["Water_Elevation"] = (
-        df_eng["Elevation"] - df_eng["Vertical_Distance_To_Hydrology"]
-    )
-    df_eng["Mean_Hillshade"] = df_eng[
-        ["Hillshade_9am", "Hillshade_Noon", "Hillshade_3pm"]
-    ].mean(axis=1)
-    df_eng["Morning_vs_Afternoon_Sun"] = (
-        df_eng["Hillshade_9am"] - df_eng["Hillshade_3pm"]
-    )
-    df_eng["Distance_To_Amenities"] = (
-        df_eng["Horizontal_Distance_To_Roadways"]
-        + df_eng["Horizontal_Distance_To_Fire_Points"]
-    )
-    return df_eng
-
-
 # ──────────────────────────────────────────────
 # Pydantic Schemas
 # ──────────────────────────────────────────────
@@ -142,22 +238,140 @@ class PredictionResponse(BaseModel):
     cover_type_id: int
     cover_type_name: str
     probabilities: dict[str, float]
+    rounds_used: int | None = None
+    expected_mcc: float | None = None
+    escalated: bool | None = None
+
+
+class ExplanationResponse(BaseModel):
+    cover_type_id: int
+    cover_type_name: str
+    probabilities: dict[str, float]
+    # Margin-space TreeSHAP values for the predicted class: bias + sum(contributions)
+    # equals that class's raw score
+    bias: float
+    contributions: dict[str, float]
+    cached: bool
+
+
+class SweepAxis(BaseModel):
+    feature: str = Field(..., example="Elevation", description="Continuous input feature to vary")
+    start: float = Field(..., example=2000)
+    stop: float = Field(..., example=3500)
+    steps: int = Field(25, ge=2, le=200)
+
+
+class SweepRequest(BaseModel):
+    base: PredictionInput
+    axes: list[SweepAxis] = Field(..., min_length=1, max_length=2)
+
+
+# Rows that skip PredictionInput (stream frames, swept values) are checked against its
+# ge/le bounds plus the physical limits in streaming.PHYSICAL_BOUNDS
+RAW_INPUT_BOUNDS = input_bounds(PredictionInput, PHYSICAL_BOUNDS)
+
+
+class SweepResponse(BaseModel):
+    features: list[str]
+    values: list[list[float]]
+    class_names: list[str]
+    # Shape (steps,) / (steps_0, steps_1) for 1-D / 2-D sweeps
+    cover_type_ids: list
+    # Shape (steps, 7) / (steps_0, steps_1, 7)
+    probabilities: list
 
 
 # ──────────────────────────────────────────────
 # Helper: run prediction on a DataFrame
 # ──────────────────────────────────────────────
-def _predict_dataframe(df_raw: pd.DataFrame):
+def _preprocess(df_raw: pd.DataFrame):
     if model is None or preprocessor is None:
         raise HTTPException(
             status_code=503,
-            detail="Model/preprocessor not loaded. Ensure champion_xgboost.joblib and spatial_preprocessor.joblib are present.",
+            detail=f"Model/preprocessor not loaded. Ensure {MODEL_PATH} and {PREPROCESSOR_PATH} are present.",
         )
     df_eng = engineer_features(df_raw)
-    X_processed = preprocessor.transform(df_eng)
-    raw_preds = model.predict(X_processed)            # 0-indexed classes
-    probas = model.predict_proba(X_processed)
-    return raw_preds, probas
+    return preprocessor.transform(df_eng)
+
+
+def _predict_dataframe(df_raw: pd.DataFrame, rounds: int | None = None, use_cascade: bool = False):
+    """Returns (raw_preds, probas, escalated); `escalated` is None outside cascade mode."""
+    return _predict_processed(_preprocess(df_raw), rounds, use_cascade)
+
+
+def _predict_processed(X_processed, rounds: int | None = None, use_cascade: bool = False):
+    if use_cascade and cascade_artifact is None:
+        raise HTTPException(status_code=503, detail=f"Cascade student not loaded. Train it with cascade.py ({CASCADE_PATH}).")
+
+    start = time.perf_counter()
+    if use_cascade:
+        probas, escalated = cascade_predict_proba(
+            cascade_artifact["model"], model, X_processed, cascade_artifact["threshold"], rounds
+        )
+    else:
+        # (0, 0) means "all rounds" to XGBoost
+        probas = model.predict_proba(X_processed, iteration_range=(0, rounds or 0))
+        escalated = None
+    seconds = time.perf_counter() - start
+    # Truncated calls are faster by design; counting them would inflate the champion
+    # (and cascade) rows/sec that /cascade/stats and /shadow/stats compare against
+    if _full_champion(rounds):
+        cascade_stats.record(len(probas), seconds, int(escalated.sum()) if escalated is not None else None)
+    raw_preds = probas.argmax(axis=1)                 # 0-indexed classes
+    return raw_preds, probas, escalated
+
+
+def _observe(df_raw: pd.DataFrame, raw_preds):
+    """Feeds real traffic (not synthetic sweep grids) into the drift monitor."""
+    if drift_monitor is not None:
+        drift_monitor.update(df_raw, raw_preds)
+
+
+def _audit(endpoint: str, df_raw: pd.DataFrame, raw_preds, probas, rounds: int | None, use_cascade: bool):
+    """Queues the request for the audit writer; a full buffer drops it rather than waiting."""
+    if audit_sink is not None:
+        audit_sink.submit(endpoint, df_raw, raw_preds, probas, rounds, use_cascade)
+
+
+def _shadow(X_processed, raw_preds):
+    """Hands the batch to the shadow candidate; sheds it if the shadow queue is full."""
+    if shadow is not None:
+        shadow.submit(X_processed, raw_preds)
+
+
+def _batch_headers(n_rows: int, rounds, expected_mcc, escalated) -> dict:
+    """Metadata for the raw-matrix encoding, which has no room for it in the body."""
+    return {
+        "X-Total-Rows": n_rows,
+        "X-Rounds-Used": rounds,
+        "X-Expected-MCC": expected_mcc,
+        "X-Escalated-Rows": int(escalated.sum()) if escalated is not None else None,
+    }
+
+
+def _full_champion(rounds: int | None) -> bool:
+    """True when `rounds` leaves the champion untruncated."""
+    return rounds is None or iteration_curve is None or rounds >= iteration_curve.total_rounds
+
+
+def _resolve_rounds(max_trees: int | None, latency_budget_ms: float | None, use_cascade: bool = False):
+    """
+    Maps the per-request limits onto (rounds_used, expected_mcc). The champion's
+    iteration curve says nothing about the cascade, so cascade requests report the
+    cascade's own held-out MCC from calibration, which was measured against the full
+    champion; with a truncated champion behind it there is no estimate (None).
+    """
+    if iteration_curve is None:
+        if max_trees is not None or latency_budget_ms is not None:
+            raise HTTPException(status_code=503, detail="Iteration curve not available; cannot truncate the model.")
+        rounds, expected_mcc = None, None
+    else:
+        rounds = iteration_curve.rounds_for(max_trees, latency_budget_ms)
+        expected_mcc = iteration_curve.expected_mcc(rounds)
+    if use_cascade:
+        full_champion = _full_champion(rounds)
+        expected_mcc = cascade_artifact["cascade_mcc"] if cascade_artifact is not None and full_champion else None
+    return rounds, expected_mcc
 
 
 # ──────────────────────────────────────────────
@@ -169,17 +383,121 @@ def health_check():
         "status": "ok",
         "model_loaded": model is not None,
         "preprocessor_loaded": preprocessor is not None,
+        "model_variant": MODEL_VARIANT,
+    }
+
+
+@app.get("/model/iteration-curve", tags=["Health"])
+def get_iteration_curve():
+    """
+    Held-out MCC and single-row latency at each truncation point, so clients can pick a
+    `max_trees` or `latency_budget_ms` for `/predict`.
+    """
+    if iteration_curve is None:
+        raise HTTPException(status_code=503, detail="Iteration curve not available.")
+    return iteration_curve.to_dict()
+
+
+@app.get("/cascade/stats", tags=["Health"])
+def get_cascade_stats():
+    """
+    Offline calibration of the cascade (threshold, escalation rate, MCC, throughput gain)
+    next to the live escalation rate and rows/sec of the cascade vs the plain champion.
+    """
+    calibration = None
+    if cascade_artifact is not None:
+        calibration = {k: v for k, v in cascade_artifact.items() if k != "model"}
+    return {"loaded": cascade_artifact is not None, "calibration": calibration, "online": cascade_stats.to_dict()}
+
+
+@app.get("/monitor/drift", tags=["Health"])
+def get_drift_report():
+    """
+    PSI of live inputs against the training baseline, per continuous feature and per
+    one-hot group, plus the live vs training class mix. PSI < 0.1 is stable,
+    0.1–0.25 a moderate shift, above 0.25 a major one.
+    """
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail=f"Drift baseline not available. Build it with drift.py ({DRIFT_BASELINE_PATH}).")
+    return drift_monitor.report()
+
+
+@app.post("/monitor/drift/reset", tags=["Health"])
+def reset_drift_monitor():
+    """Clears the live sketches, e.g. to start a fresh monitoring window."""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail=f"Drift baseline not available. Build it with drift.py ({DRIFT_BASELINE_PATH}).")
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+
+@app.get("/stream/stats", tags=["Health"])
+def get_stream_stats():
+    """Connections, messages/sec and coalesced batch sizes for `/ws/predict`."""
+    return stream_stats.to_dict()
+
+
+@app.get("/shadow/stats", tags=["Health"])
+def get_shadow_stats():
+    """
+    Online comparison of the shadow candidate with the served predictions: agreement
+    rate (overall and per served class), the served-vs-candidate confusion matrix,
+    candidate latency and how many rows were shed because the shadow queue was full.
+    """
+    if shadow is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "candidate": SHADOW_MODEL_PATH,
+        "primary_rows_per_sec": cascade_stats.to_dict()["champion_rows_per_sec"],
+        **shadow.stats(list(COVER_TYPES.values())),
     }
 
 
+@app.post("/shadow/reset", tags=["Health"])
+def reset_shadow_stats():
+    """Clears the shadow counters, e.g. after swapping the candidate file."""
+    if shadow is None:
+        raise HTTPException(status_code=503, detail="Shadow mode not enabled. Set FOREST_SHADOW_MODEL.")
+    shadow.reset()
+    return {"status": "reset"}
+
+
+@app.get("/audit/stats", tags=["Health"])
+def get_audit_stats():
+    """Audit sink buffer occupancy, written / dropped row counters and current file."""
+    if audit_sink is None:
+        return {"enabled": False}
+    return {"enabled": True, **audit_sink.stats()}
+
+
 @app.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
-def predict_single(payload: PredictionInput):
+def predict_single(
+    payload: PredictionInput,
+    request: Request,
+    max_trees: int | None = Query(None, ge=1, description="Cap on boosting rounds used"),
+    latency_budget_ms: float | None = Query(None, gt=0, description="Per-row model latency budget in ms"),
+    cascade: bool = Query(False, description="Score with the cheap first stage, escalating only uncertain rows"),
+):
     """
     Accepts a single terrain observation and returns the predicted forest cover type
     along with class probabilities.
+
+    Pass `max_trees` or `latency_budget_ms` to trade a little MCC for lower latency;
+    the response reports the rounds actually used and the held-out MCC at that point.
+    With `cascade=true` the response says whether the row was escalated to the champion.
+
+    Send `Accept: application/msgpack` or `Accept: application/x-forest-matrix` for a
+    binary response (see `/predict/batch`).
     """
+    media, dtype = negotiate_media(request.headers.get("accept"))
+    rounds, expected_mcc = _resolve_rounds(max_trees, latency_budget_ms, cascade)
     df_raw = pd.DataFrame([payload.model_dump()])
-    raw_preds, probas = _predict_dataframe(df_raw)
+    X_processed = _preprocess(df_raw)
+    raw_preds, probas, escalated = _predict_processed(X_processed, rounds, cascade)
+    _observe(df_raw, raw_preds)
+    _audit("/predict", df_raw, raw_preds, probas, rounds, cascade)
+    _shadow(X_processed, raw_preds)
 
     # Notebook shifts labels: model outputs 0–6, original classes are 1–7
     pred_class = int(raw_preds[0]) + 1
@@ -187,15 +505,112 @@ def predict_single(payload: PredictionInput):
         COVER_TYPES[i + 1]: round(float(probas[0][i]), 4) for i in range(7)
     }
 
-    return PredictionResponse(
+    response = PredictionResponse(
         cover_type_id=pred_class,
         cover_type_name=COVER_TYPES.get(pred_class, f"Class {pred_class}"),
         probabilities=prob_dict,
+        rounds_used=rounds,
+        expected_mcc=expected_mcc,
+        escalated=bool(escalated[0]) if escalated is not None else None,
+    )
+    if media == MEDIA_MSGPACK:
+        return encoded_response(encode_msgpack(response.model_dump()), media, request.headers.get("accept-encoding"))
+    if media == MEDIA_MATRIX:
+        return encoded_response(
+            encode_matrix(raw_preds + 1, probas, dtype), media, request.headers.get("accept-encoding"),
+            _batch_headers(1, rounds, expected_mcc, escalated),
+        )
+    return response
+
+
+@app.post("/explain", response_model=ExplanationResponse, tags=["Explainability"])
+def explain_single(
+    payload: PredictionInput,
+    top_k: int | None = Query(None, ge=1, le=57, description="Return only the k largest contributions"),
+):
+    """
+    Predicts a single observation and explains it: per-feature TreeSHAP contributions
+    (XGBoost `pred_contribs`) for the predicted class, keyed by preprocessed feature name
+    and ordered by absolute size. Repeated inputs are served from an in-memory cache.
+    """
+    df_raw = pd.DataFrame([payload.model_dump()])
+    X_processed = _preprocess(df_raw)
+    raw_preds, probas, _ = _predict_processed(X_processed)
+    contribs, cached = explainer.contributions(X_processed, row_keys(df_raw))
+    explanation = explainer.explain_rows(contribs, raw_preds, top_k)[0]
+
+    pred_class = int(raw_preds[0]) + 1
+    return ExplanationResponse(
+        cover_type_id=pred_class,
+        cover_type_name=COVER_TYPES.get(pred_class, f"Class {pred_class}"),
+        probabilities={COVER_TYPES[i + 1]: round(float(probas[0][i]), 4) for i in range(7)},
+        bias=explanation["bias"],
+        contributions=explanation["contributions"],
+        cached=bool(cached[0]),
+    )
+
+
+@app.post("/predict/sweep", response_model=SweepResponse, tags=["Prediction"])
+def predict_sweep(request: SweepRequest):
+    """
+    What-if sensitivity sweep: varies one or two continuous features of a base
+    observation over evenly spaced values and scores the whole grid in one batched call.
+
+    Returns the probability curve (1-D) or surface (2-D) for every class.
+    """
+    features = [axis.feature for axis in request.axes]
+    for feature in features:
+        if feature not in RAW_CONTINUOUS_FEATURES:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Cannot sweep '{feature}'. Choose one of: {', '.join(RAW_CONTINUOUS_FEATURES)}",
+            )
+    if len(set(features)) != len(features):
+        raise HTTPException(status_code=422, detail="Sweep axes must use different features.")
+    # Swept values bypass PredictionInput, so hold them to the same bounds as the stream
+    low, high, _ = RAW_INPUT_BOUNDS
+    for axis in request.axes:
+        j = RAW_FEATURES.index(axis.feature)
+        if not (np.isfinite([axis.start, axis.stop]).all()
+                and low[j] <= min(axis.start, axis.stop) and max(axis.start, axis.stop) <= high[j]):
+            raise HTTPException(
+                status_code=422,
+                detail=f"Sweep range for '{axis.feature}' must stay within [{low[j]:g}, {high[j]:g}].",
+            )
+
+    values = [np.linspace(axis.start, axis.stop, axis.steps) for axis in request.axes]
+    grid = np.meshgrid(*values, indexing="ij")
+    shape = grid[0].shape
+
+    # One (n, 54) matrix: the base row tiled, then the swept columns overwritten
+    base = request.base.model_dump()
+    columns = list(base)
+    X_raw = np.tile(np.fromiter(base.values(), dtype=np.float64, count=len(base)), (grid[0].size, 1))
+    for feature, column in zip(features, grid):
+        X_raw[:, columns.index(feature)] = column.ravel()
+    df_raw = pd.DataFrame(X_raw, columns=columns)
+
+    raw_preds, probas, _ = _predict_dataframe(df_raw)
+
+    return SweepResponse(
+        features=features,
+        values=[v.round(4).tolist() for v in values],
+        class_names=[COVER_TYPES[i + 1] for i in range(7)],
+        cover_type_ids=(raw_preds + 1).reshape(shape).tolist(),
+        probabilities=probas.astype(np.float64).round(4).reshape(*shape, 7).tolist(),
     )
 
 
 @app.post("/predict/batch", tags=["Prediction"])
-async def predict_batch(file: UploadFile = File(...)):
+async def predict_batch(
+    request: Request,
+    file: UploadFile = File(...),
+    max_trees: int | None = Query(None, ge=1, description="Cap on boosting rounds used"),
+    latency_budget_ms: float | None = Query(None, gt=0, description="Per-row model latency budget in ms"),
+    cascade: bool = Query(False, description="Score with the cheap first stage, escalating only uncertain rows"),
+    explain: bool = Query(False, description="Attach per-feature TreeSHAP contributions to every row"),
+    top_k: int | None = Query(None, ge=1, le=57, description="With explain=true, keep only the k largest contributions"),
+):
     """
     Accepts a CSV file (no target column required) and returns predictions for every row.
 
@@ -204,11 +619,49 @@ async def predict_batch(file: UploadFile = File(...)):
     - `cover_type_id`
     - `cover_type_name`
     - `probabilities`
+    - `explanation` (only with `explain=true`; it explains the model truncated to
+      `rounds_used`, and cannot be combined with `cascade=true`)
+
+    Compact alternatives, chosen with `Accept` (both take `; dtype=float16|float32`):
+    - `application/msgpack`: the metadata above plus `class_names`, `shape`, `dtype`,
+      and `cover_type_ids` (uint8) / `probabilities` (row-major) as raw little-endian bytes
+    - `application/x-forest-matrix`: 12-byte header `<4sBBHI` (b"FCPM", version, dtype
+      size, n_classes, n_rows), then the uint8 class ids, then the probability matrix;
+      metadata goes in `X-Total-Rows`, `X-Rounds-Used`, `X-Expected-MCC`, `X-Escalated-Rows`
+
+    Responses of 1 KB or more are compressed with zstd or gzip per `Accept-Encoding`.
     """
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are accepted.")
+    media, dtype = negotiate_media(request.headers.get("accept"))
+    if explain and media == MEDIA_MATRIX:
+        raise HTTPException(status_code=406, detail="explain=true needs a JSON or MessagePack response.")
+    if explain and cascade:
+        # Rows are scored by the student or the champion; one explainer cannot cover both
+        raise HTTPException(status_code=422, detail="explain=true cannot be combined with cascade=true.")
 
     contents = await file.read()
+    rounds, expected_mcc = _resolve_rounds(max_trees, latency_budget_ms, cascade)
+    # Parsing and inference are CPU-bound; run them off the event loop so concurrent
+    # batch uploads overlap instead of queueing behind each other
+    return await run_in_threadpool(
+        _score_batch_csv, contents, rounds, expected_mcc, cascade, explain, top_k,
+        media, dtype, request.headers.get("accept-encoding"),
+    )
+
+
+
+def _score_batch_csv(
+    contents: bytes,
+    rounds: int | None,
+    expected_mcc: float | None,
+    use_cascade: bool,
+    explain: bool = False,
+    top_k: int | None = None,
+    media: str = MEDIA_JSON,
+    dtype: np.dtype = np.dtype("<f4"),
+    accept_encoding: str | None = None,
+):
     try:
         df_raw = pd.read_csv(io.StringIO(contents.decode("utf-8")))
     except Exception as e:
@@ -217,7 +670,34 @@ async def predict_batch(file: UploadFile = File(...)):
     # Drop target column if accidentally included
     df_raw = df_raw.drop(columns=["Cover_Type"], errors="ignore")
 
-    raw_preds, probas = _predict_dataframe(df_raw)
+    X_processed = _preprocess(df_raw)
+    raw_preds, probas, escalated = _predict_processed(X_processed, rounds, use_cascade)
+    _observe(df_raw, raw_preds)
+    _audit("/predict/batch", df_raw, raw_preds, probas, rounds, use_cascade)
+    _shadow(X_processed, raw_preds)
+    explanations = None
+    if explain:
+        # Explain the same truncated model that produced the probabilities
+        contribs, _ = explainer.contributions(X_processed, row_keys(df_raw), rounds)
+        explanations = explainer.explain_rows(contribs, raw_preds, top_k)
+
+    # Binary encodings go straight from the arrays, without per-row dicts
+    if media == MEDIA_MATRIX:
+        return encoded_response(
+            encode_matrix(raw_preds + 1, probas, dtype), media, accept_encoding,
+            _batch_headers(len(raw_preds), rounds, expected_mcc, escalated),
+        )
+    if media == MEDIA_MSGPACK:
+        meta = {
+            "total_rows": len(raw_preds),
+            "rounds_used": rounds,
+            "expected_mcc": expected_mcc,
+            "escalated_rows": int(escalated.sum()) if escalated is not None else None,
+        }
+        return encoded_response(
+            batch_msgpack(meta, list(COVER_TYPES.values()), raw_preds + 1, probas, dtype, explanations),
+            media, accept_encoding,
+        )
 
     results = []
     for i, (pred, prob_row) in enumerate(zip(raw_preds, probas)):
@@ -232,5 +712,74 @@ async def predict_batch(file: UploadFile = File(...)):
                 },
             }
         )
+        if explanations is not None:
+            results[-1]["explanation"] = explanations[i]
+
+    payload = {
+        "total_rows": len(results),
+        "rounds_used": rounds,
+        "expected_mcc": expected_mcc,
+        "escalated_rows": int(escalated.sum()) if escalated is not None else None,
+        "predictions": results,
+    }
+    return encoded_response(JSONResponse(payload).body, MEDIA_JSON, accept_encoding)
+
+
+# ──────────────────────────────────────────────
+# WebSocket Streaming
+# ──────────────────────────────────────────────
+def _predict_stream_rows(X: np.ndarray, rounds: int | None, use_cascade: bool):
+    """Scores a coalesced (n, 54) matrix; no Pydantic model per observation."""
+    df_raw = pd.DataFrame(X, columns=RAW_FEATURES)
+    X_processed = _preprocess(df_raw)
+    raw_preds, probas, _ = _predict_processed(X_processed, rounds, use_cascade)
+    _observe(df_raw, raw_preds)
+    _audit("/ws/predict", df_raw, raw_preds, probas, rounds, use_cascade)
+    _shadow(X_processed, raw_preds)
+    return raw_preds, probas
 
-    return {"total_rows": len(results), "predictions": results}
\ No newline at end of file
+
+@app.websocket("/ws/predict")
+async def predict_stream(
+    websocket: WebSocket,
+    max_trees: int | None = Query(None, ge=1),
+    latency_budget_ms: float | None = Query(None, gt=0),
+    cascade: bool = Query(False),
+    max_batch_rows: int = Query(4096, ge=1, le=65536),
+    max_wait_ms: float = Query(0.0, ge=0, le=100),
+):
+    """
+    Streaming predictions for high-rate interactive clients (see `streaming.py` for the
+    frame format). Observations from frames that arrive while a batch is being scored
+    are coalesced into one inference call; results come back tagged with the client's
+    ids. `max_wait_ms` trades a little latency for bigger batches.
+    """
+    await websocket.accept()
+    try:
+        if model is None or preprocessor is None:
+            raise HTTPException(status_code=503, detail="Model/preprocessor not loaded.")
+        if cascade and cascade_artifact is None:
+            raise HTTPException(status_code=503, detail=f"Cascade student not loaded. Train it with cascade.py ({CASCADE_PATH}).")
+        rounds, expected_mcc = _resolve_rounds(max_trees, latency_budget_ms, cascade)
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1011)
+        return
+
+    hello = {
+        "features": RAW_FEATURES,
+        "compact_features": COMPACT_FEATURES,
+        "class_names": list(COVER_TYPES.values()),
+        "max_frame_rows": MAX_FRAME_ROWS,
+        "rounds_used": rounds,
+        "expected_mcc": expected_mcc,
+    }
+    stream_stats.connection(opened=True)
+    try:
+        await serve_stream(
+            websocket,
+            lambda X: _predict_stream_rows(X, rounds, cascade),
+            stream_stats, hello, max_batch_rows, max_wait_ms, RAW_INPUT_BOUNDS,
+        )
+    finally:
+        stream_stats.connection(opened=False)
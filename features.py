@@ -0,0 +1,135 @@
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, PowerTransformer, StandardScaler
+import pandas as pd
+import numpy as np
+
+# ──────────────────────────────────────────────
+# Feature Lists  (mirrors notebook exactly)
+# ──────────────────────────────────────────────
+RAW_CONTINUOUS_FEATURES = [
+    "Elevation", "Aspect", "Slope",
+    "Horizontal_Distance_To_Hydrology", "Vertical_Distance_To_Hydrology",
+    "Horizontal_Distance_To_Roadways", "Horizontal_Distance_To_Fire_Points",
+    "Hillshade_9am", "Hillshade_Noon", "Hillshade_3pm",
+]
+
+WILDERNESS_FEATURES = [f"Wilderness_Area{i}" for i in range(1, 5)]
+SOIL_FEATURES = [f"Soil_Type{i}" for i in range(1, 41)]
+
+# The 54 flat fields the API accepts, in dataset column order
+RAW_FEATURES = RAW_CONTINUOUS_FEATURES + WILDERNESS_FEATURES + SOIL_FEATURES
+
+CONTINUOUS_FEATURES = RAW_CONTINUOUS_FEATURES + [
+    "Euclidean_Distance_To_Hydrology", "Water_Elevation", "Distance_To_Amenities",
+]
+BINARY_FEATURES = WILDERNESS_FEATURES + SOIL_FEATURES
+
+# Column order of the preprocessor output matrix
+PROCESSED_FEATURES = CONTINUOUS_FEATURES + BINARY_FEATURES
+
+# Native-categorical variant: the 44 flags collapse into two categoricals (codes 1–4 / 1–40)
+CATEGORICAL_FEATURES = ["Wilderness_Area", "Soil_Type"]
+CATEGORICAL_PROCESSED_FEATURES = CONTINUOUS_FEATURES + CATEGORICAL_FEATURES
+
+TARGET = "Cover_Type"
+
+
+# ──────────────────────────────────────────────
+# Feature Engineering
+# ──────────────────────────────────────────────
+def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+    df_eng = df.copy()
+    # Computed in float64: with int16 inputs (the notebook's downcast) squaring
+    # distances overflows and sums/differences can wrap around
+    horizontal = df_eng["Horizontal_Distance_To_Hydrology"].astype(np.float64)
+    vertical = df_eng["Vertical_Distance_To_Hydrology"].astype(np.float64)
+    df_eng["Euclidean_Distance_To_Hydrology"] = np.sqrt(horizontal ** 2 + vertical ** 2)
+    df_eng["Water_Elevation"] = df_eng["Elevation"].astype(np.float64) - vertical
+    df_eng["Mean_Hillshade"] = df_eng[
+        ["Hillshade_9am", "Hillshade_Noon", "Hillshade_3pm"]
+    ].mean(axis=1)
+    df_eng["Morning_vs_Afternoon_Sun"] = (
+        df_eng["Hillshade_9am"] - df_eng["Hillshade_3pm"]
+    )
+    df_eng["Distance_To_Amenities"] = (
+        df_eng["Horizontal_Distance_To_Roadways"].astype(np.float64)
+        + df_eng["Horizontal_Distance_To_Fire_Points"]
+    )
+    return df_eng
+
+
+def collapse_one_hot(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces the Wilderness/Soil one-hot flags with two pandas categoricals with fixed
+    categories, so codes are identical at training and serving time. A row with no
+    flag set becomes a missing value.
+    """
+    df_cat = df.drop(columns=BINARY_FEATURES)
+    for name, columns in zip(CATEGORICAL_FEATURES, (WILDERNESS_FEATURES, SOIL_FEATURES)):
+        flags = df[columns].to_numpy()
+        codes = np.where(flags.any(axis=1), flags.argmax(axis=1), -1)
+        df_cat[name] = pd.Categorical.from_codes(codes, categories=range(1, len(columns) + 1))
+    return df_cat
+
+
+def _continuous_pipeline() -> Pipeline:
+    return Pipeline(steps=[
+        ("yeo_johnson", PowerTransformer(method="yeo-johnson")),
+        ("scaler", StandardScaler()),
+    ])
+
+
+def build_preprocessor() -> ColumnTransformer:
+    """
+    Yeo-Johnson + StandardScaler on the continuous features, binary flags passed
+    through untouched. The redundant hillshade features are dropped via `remainder`.
+    """
+    return ColumnTransformer(
+        transformers=[
+            ("continuous", _continuous_pipeline(), CONTINUOUS_FEATURES),
+            ("binary", "passthrough", BINARY_FEATURES),
+        ],
+        remainder="drop",
+    )
+
+
+def build_categorical_preprocessor() -> Pipeline:
+    """
+    Same continuous treatment as `build_preprocessor`, but the one-hot flags are first
+    collapsed into `Wilderness_Area` / `Soil_Type` categoricals. Outputs a DataFrame so
+    the category dtype reaches XGBoost (`enable_categorical=True`).
+    """
+    columns = ColumnTransformer(
+        transformers=[
+            ("continuous", _continuous_pipeline(), CONTINUOUS_FEATURES),
+            ("categorical", "passthrough", CATEGORICAL_FEATURES),
+        ],
+        remainder="drop",
+        verbose_feature_names_out=False,
+    ).set_output(transform="pandas")
+    return Pipeline(steps=[
+        ("collapse", FunctionTransformer(collapse_one_hot)),
+        ("columns", columns),
+    ])
+
+
+# ──────────────────────────────────────────────
+# Dataset Loading
+# ──────────────────────────────────────────────
+def load_dataset(path: str = "covtype.csv") -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Reads the raw CSV, downcasts the one-hot flags to int8, applies feature
+    engineering and returns (X, y) with y shifted to 0–6.
+
+    Continuous columns are left at full width; `engineer_features` works in float64
+    either way, so downcast inputs cannot overflow.
+    """
+    df = pd.read_csv(path)
+    df[BINARY_FEATURES] = df[BINARY_FEATURES].astype(np.int8)
+    df = engineer_features(df)
+
+    X = df.drop(columns=[TARGET])
+    # The XGBoost Gotcha: Shift classes from 1-7 to 0-6
+    y = (df[TARGET] - 1).astype(np.int8)
+    return X, y
@@ -0,0 +1,7 @@
+"""First-party Python client for the Forest Cover Type Predictor API."""
+
+from ._common import FEATURE_COLUMNS, ForestClientError
+from .async_client import AsyncForestClient
+from .client import ForestClient
+
+__all__ = ["AsyncForestClient", "FEATURE_COLUMNS", "ForestClient", "ForestClientError"]
@@ -0,0 +1,94 @@
+import io
+import random
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────
+# Schema  (the 54 flat fields `fast_api.py` accepts, in dataset order)
+# ──────────────────────────────────────────────
+CONTINUOUS_COLUMNS = [
+    "Elevation", "Aspect", "Slope",
+    "Horizontal_Distance_To_Hydrology", "Vertical_Distance_To_Hydrology",
+    "Horizontal_Distance_To_Roadways", "Horizontal_Distance_To_Fire_Points",
+    "Hillshade_9am", "Hillshade_Noon", "Hillshade_3pm",
+]
+FEATURE_COLUMNS = (
+    CONTINUOUS_COLUMNS
+    + [f"Wilderness_Area{i}" for i in range(1, 5)]
+    + [f"Soil_Type{i}" for i in range(1, 41)]
+)
+
+# Transient statuses worth retrying; everything else is the caller's problem
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ForestClientError(Exception):
+    """Raised when the API rejects a request or retries are exhausted."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ──────────────────────────────────────────────
+# Input / Output Conversion
+# ──────────────────────────────────────────────
+def to_frame(data) -> pd.DataFrame:
+    """
+    Normalizes pandas, NumPy (n × 54, dataset column order), Arrow tables/record
+    batches and lists of dicts into a DataFrame with exactly the 54 API columns.
+    """
+    if isinstance(data, pd.DataFrame):
+        df = data
+    elif isinstance(data, np.ndarray):
+        if data.ndim != 2 or data.shape[1] != len(FEATURE_COLUMNS):
+            raise ValueError(f"NumPy input must have shape (n, {len(FEATURE_COLUMNS)}), got {data.shape}")
+        df = pd.DataFrame(data, columns=FEATURE_COLUMNS)
+    elif hasattr(data, "to_pandas"):            # pyarrow.Table / RecordBatch, without importing pyarrow
+        df = data.to_pandas()
+    elif isinstance(data, (list, tuple)):
+        df = pd.DataFrame(list(data))
+    else:
+        raise TypeError(f"Unsupported input type: {type(data).__name__}")
+
+    missing = [c for c in CONTINUOUS_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+    # One-hot flags default to 0, matching the API schema
+    return df.reindex(columns=FEATURE_COLUMNS, fill_value=0)
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int):
+    """Yields (chunk_index, csv_bytes) in input order."""
+    for i, start in enumerate(range(0, len(df), chunk_rows)):
+        buf = io.StringIO()
+        df.iloc[start:start + chunk_rows].to_csv(buf, index=False)
+        yield i, buf.getvalue().encode("utf-8")
+
+
+def parse_batch_response(payload: dict) -> pd.DataFrame:
+    """Turns one `/predict/batch` JSON response into a frame: id, name, one column per class."""
+    preds = payload["predictions"]
+    if not preds:
+        return pd.DataFrame(columns=["cover_type_id", "cover_type_name"])
+    class_names = list(preds[0]["probabilities"])
+    probs = np.array([[p["probabilities"][c] for c in class_names] for p in preds], dtype=np.float32)
+    frame = pd.DataFrame(probs, columns=[f"p_{c}" for c in class_names])
+    frame.insert(0, "cover_type_name", [p["cover_type_name"] for p in preds])
+    frame.insert(0, "cover_type_id", np.array([p["cover_type_id"] for p in preds], dtype=np.int8))
+    return frame
+
+
+def concat_chunks(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Reassembles per-chunk frames (already in chunk order) with a 0..n-1 row index."""
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def backoff_delay(attempt: int, base: float) -> float:
+    """Exponential backoff with full jitter: uniform(0, base * 2**attempt)."""
+    return random.uniform(0, base * (2 ** attempt))
+
+
+def error_detail(status_code: int, body: str) -> str:
+    return f"API returned {status_code}: {body[:500]}"
@@ -0,0 +1,104 @@
+import asyncio
+
+import pandas as pd
+
+from ._common import (
+    RETRY_STATUSES,
+    ForestClientError,
+    backoff_delay,
+    concat_chunks,
+    error_detail,
+    iter_chunks,
+    parse_batch_response,
+    to_frame,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+class AsyncForestClient:
+    """
+    `asyncio` client for the Forest Cover API, built on a pooled `httpx.AsyncClient`.
+
+    Batch inputs are chunked like `ForestClient.predict_batch`; at most `concurrency`
+    chunks are in flight at once and results come back in input order.
+
+        async with AsyncForestClient(max_connections=8) as client:
+            results = await client.predict_batch(df)
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        max_connections: int = 4,
+        chunk_rows: int = 5_000,
+        max_retries: int = 3,
+        backoff: float = 0.25,
+        timeout: float = 60.0,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncForestClient requires httpx: pip install httpx")
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.chunk_rows = chunk_rows
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    # ── lifecycle ──
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # ── transport ──
+    async def _request(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt == self.max_retries:
+                    raise ForestClientError(f"Request failed after {attempt + 1} attempts: {e}") from e
+            else:
+                if response.status_code < 400:
+                    return response
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise ForestClientError(error_detail(response.status_code, response.text), response.status_code)
+            await asyncio.sleep(backoff_delay(attempt, self.backoff))
+
+    # ── endpoints ──
+    async def health(self) -> dict:
+        return (await self._request("GET", "/")).json()
+
+    async def predict(self, observation: dict, **params) -> dict:
+        return (await self._request("POST", "/predict", json=observation, params=params or None)).json()
+
+    async def predict_batch(self, data, chunk_rows: int | None = None, concurrency: int | None = None, **params) -> pd.DataFrame:
+        """Async counterpart of `ForestClient.predict_batch`."""
+        df = to_frame(data)
+        semaphore = asyncio.Semaphore(min(concurrency or self.max_connections, self.max_connections))
+
+        async def post_chunk(csv_bytes: bytes) -> pd.DataFrame:
+            async with semaphore:
+                response = await self._request(
+                    "POST", "/predict/batch",
+                    files={"file": ("chunk.csv", csv_bytes, "text/csv")},
+                    params=params or None,
+                )
+            return parse_batch_response(response.json())
+
+        # gather() preserves argument order, so chunks reassemble in input order
+        frames = await asyncio.gather(*(post_chunk(body) for _, body in iter_chunks(df, chunk_rows or self.chunk_rows)))
+        return concat_chunks(list(frames))
@@ -0,0 +1,121 @@
+"""
+Throughput benchmark for the client SDK against a local uvicorn.
+
+    python -m forest_client.benchmark --spawn --workers 4 --rows 100000 --concurrency 1 2 4 8
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ._common import FEATURE_COLUMNS
+from .async_client import AsyncForestClient
+from .client import ForestClient
+
+
+def synthetic_rows(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Random observations inside the API's valid ranges, one wilderness/soil flag each."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Elevation": rng.integers(1850, 3850, n_rows),
+        "Aspect": rng.integers(0, 360, n_rows),
+        "Slope": rng.integers(0, 60, n_rows),
+        "Horizontal_Distance_To_Hydrology": rng.integers(0, 1400, n_rows),
+        "Vertical_Distance_To_Hydrology": rng.integers(-150, 550, n_rows),
+        "Horizontal_Distance_To_Roadways": rng.integers(0, 7000, n_rows),
+        "Horizontal_Distance_To_Fire_Points": rng.integers(0, 7000, n_rows),
+        "Hillshade_9am": rng.integers(0, 256, n_rows),
+        "Hillshade_Noon": rng.integers(0, 256, n_rows),
+        "Hillshade_3pm": rng.integers(0, 256, n_rows),
+    })
+    flags = np.zeros((n_rows, 44), dtype=np.int8)
+    flags[np.arange(n_rows), rng.integers(0, 4, n_rows)] = 1
+    flags[np.arange(n_rows), 4 + rng.integers(0, 40, n_rows)] = 1
+    df[FEATURE_COLUMNS[10:]] = flags
+    return df
+
+
+def spawn_server(port: int, workers: int, env: dict | None = None) -> subprocess.Popen:
+    """Starts uvicorn on `port` and waits until the model is loaded. `env` replaces the environment."""
+    proc = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "fast_api:app",
+        "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ], env=env)
+    with ForestClient(f"http://127.0.0.1:{port}", max_retries=0) as client:
+        for _ in range(120):
+            try:
+                if client.health().get("model_loaded"):
+                    return proc
+            except Exception:
+                pass
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+def time_sync(url: str, df: pd.DataFrame, concurrency: int, chunk_rows: int) -> float:
+    with ForestClient(url, max_connections=concurrency, chunk_rows=chunk_rows) as client:
+        client.predict_batch(df.head(chunk_rows))          # warm the connection pool
+        start = time.perf_counter()
+        result = client.predict_batch(df)
+        elapsed = time.perf_counter() - start
+    assert len(result) == len(df)
+    return elapsed
+
+
+def time_async(url: str, df: pd.DataFrame, concurrency: int, chunk_rows: int) -> float:
+    async def run():
+        async with AsyncForestClient(url, max_connections=concurrency, chunk_rows=chunk_rows) as client:
+            await client.predict_batch(df.head(chunk_rows))
+            start = time.perf_counter()
+            result = await client.predict_batch(df)
+            elapsed = time.perf_counter() - start
+        assert len(result) == len(df)
+        return elapsed
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client SDK throughput vs. concurrency.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn workers when --spawn is set")
+    parser.add_argument("--data", default=None, help="CSV to score (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-rows", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).head(args.rows) if args.data else synthetic_rows(args.rows)
+    url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+    proc = spawn_server(args.port, args.workers) if args.spawn else None
+
+    try:
+        rows = []
+        for concurrency in args.concurrency:
+            for mode, fn in (("sync", time_sync), ("async", time_async)):
+                if args.mode not in (mode, "both"):
+                    continue
+                elapsed = fn(url, df, concurrency, args.chunk_rows)
+                rows.append({"mode": mode, "concurrency": concurrency, "seconds": elapsed, "rows_per_sec": len(df) / elapsed})
+                print(f"{mode:>5} x{concurrency:<3} {elapsed:7.2f}s  {len(df) / elapsed:>10,.0f} rows/s")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    report = pd.DataFrame(rows)
+    base = report[report["concurrency"] == report["concurrency"].min()].set_index("mode")["rows_per_sec"]
+    report["speedup"] = report["rows_per_sec"] / report["mode"].map(base)
+    print("\n" + report.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from ._common import (
+    RETRY_STATUSES,
+    ForestClientError,
+    backoff_delay,
+    concat_chunks,
+    error_detail,
+    iter_chunks,
+    parse_batch_response,
+    to_frame,
+)
+
+
+class ForestClient:
+    """
+    Synchronous client for the Forest Cover API.
+
+    One pooled keep-alive `requests.Session` sized for `max_connections`; large batch
+    inputs are split into `chunk_rows` CSV chunks and sent over up to `concurrency`
+    connections at once, then reassembled in input order.
+
+        with ForestClient("http://localhost:8000", max_connections=8) as client:
+            results = client.predict_batch(df)
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        max_connections: int = 4,
+        chunk_rows: int = 5_000,
+        max_retries: int = 3,
+        backoff: float = 0.25,
+        timeout: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.chunk_rows = chunk_rows
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    # ── lifecycle ──
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── transport ──
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise ForestClientError(f"Request failed after {attempt + 1} attempts: {e}") from e
+            else:
+                if response.status_code < 400:
+                    return response
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise ForestClientError(error_detail(response.status_code, response.text), response.status_code)
+            time.sleep(backoff_delay(attempt, self.backoff))
+
+    # ── endpoints ──
+    def health(self) -> dict:
+        return self._request("GET", "/").json()
+
+    def predict(self, observation: dict, **params) -> dict:
+        """Single observation via `/predict`; extra keyword args become query params."""
+        return self._request("POST", "/predict", json=observation, params=params or None).json()
+
+    def _post_chunk(self, csv_bytes: bytes, params: dict) -> pd.DataFrame:
+        response = self._request(
+            "POST", "/predict/batch",
+            files={"file": ("chunk.csv", csv_bytes, "text/csv")},
+            params=params or None,
+        )
+        return parse_batch_response(response.json())
+
+    def predict_batch(self, data, chunk_rows: int | None = None, concurrency: int | None = None, **params) -> pd.DataFrame:
+        """
+        Scores pandas / NumPy / Arrow / list-of-dicts input via `/predict/batch`.
+        Returns one row per input row, in input order.
+        """
+        df = to_frame(data)
+        chunks = list(iter_chunks(df, chunk_rows or self.chunk_rows))
+        workers = min(concurrency or self.max_connections, self.max_connections, len(chunks) or 1)
+
+        if workers <= 1:
+            frames = [self._post_chunk(body, params) for _, body in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order, so chunks reassemble in input order
+                frames = list(pool.map(lambda chunk: self._post_chunk(chunk[1], params), chunks))
+        return concat_chunks(frames)
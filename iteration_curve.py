@@ -0,0 +1,125 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import matthews_corrcoef
+from sklearn.model_selection import train_test_split
+
+from features import TARGET, RAW_FEATURES
+
+# ──────────────────────────────────────────────
+# Accuracy-vs-Iteration Curve
+# ──────────────────────────────────────────────
+# Rounds are XGBoost boosting rounds (one tree per class each), i.e. the unit of
+# `iteration_range`. The champion has 202 of them.
+
+
+class IterationCurve:
+    """
+    Held-out MCC and single-row latency at a grid of truncation points, used to map a
+    per-request `max_trees` / `latency_budget_ms` onto an `iteration_range`.
+    """
+
+    def __init__(self, rounds: list[int], mcc: list[float | None], latency_ms: list[float]):
+        self.rounds = rounds
+        self.mcc = mcc
+        self.latency_ms = latency_ms
+
+    @property
+    def total_rounds(self) -> int:
+        return self.rounds[-1]
+
+    def rounds_for(self, max_trees: int | None = None, latency_budget_ms: float | None = None) -> int:
+        """Most rounds allowed by both limits; never fewer than the first grid point."""
+        rounds = self.total_rounds
+        if max_trees is not None:
+            rounds = min(rounds, max(1, max_trees))
+        if latency_budget_ms is not None:
+            within = [r for r, ms in zip(self.rounds, self.latency_ms) if ms <= latency_budget_ms]
+            rounds = min(rounds, within[-1] if within else self.rounds[0])
+        return rounds
+
+    def expected_mcc(self, rounds: int) -> float | None:
+        """Held-out MCC at `rounds`, linearly interpolated between grid points."""
+        known = [(r, m) for r, m in zip(self.rounds, self.mcc) if m is not None]
+        if not known:
+            return None
+        xs, ys = zip(*known)
+        return round(float(np.interp(rounds, xs, ys)), 4)
+
+    def to_dict(self) -> dict:
+        return {"rounds": self.rounds, "mcc": self.mcc, "latency_ms": self.latency_ms}
+
+
+def _rounds_grid(total_rounds: int, step: int) -> list[int]:
+    grid = list(range(step, total_rounds, step))
+    return [1] + [r for r in grid if r > 1] + [total_rounds]
+
+
+def _single_row_latency_ms(model, row: np.ndarray, rounds: int, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row, iteration_range=(0, rounds))
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def build_iteration_curve(
+    model,
+    X_processed: np.ndarray | None = None,
+    y: np.ndarray | None = None,
+    step: int = 10,
+    latency_repeats: int = 25,
+) -> IterationCurve:
+    """
+    Scores the held-out matrix with `iteration_range=(0, k)` for k on a grid of
+    boosting rounds and times a single-row prediction at each k. Without a held-out
+    set only the latency column is filled in.
+    """
+    total_rounds = model.get_booster().num_boosted_rounds()
+    rounds = _rounds_grid(total_rounds, step)
+
+    mcc = []
+    if X_processed is not None and y is not None:
+        for k in rounds:
+            preds = model.predict_proba(X_processed, iteration_range=(0, k)).argmax(axis=1)
+            mcc.append(round(float(matthews_corrcoef(y, preds)), 4))
+        row = X_processed[:1]
+    else:
+        mcc = [None] * len(rounds)
+        row = np.zeros((1, model.n_features_in_), dtype=np.float32)
+
+    latency_ms = [round(_single_row_latency_ms(model, row, k, latency_repeats), 4) for k in rounds]
+    return IterationCurve(rounds, mcc, latency_ms)
+
+
+# ──────────────────────────────────────────────
+# CLI: export the held-out sample the service scores at startup
+# ──────────────────────────────────────────────
+def export_holdout(data_path: str, out_path: str, n_rows: int) -> pd.DataFrame:
+    """
+    Reproduces the notebook's 80/20 stratified split (random_state=42) and writes a
+    stratified sample of the 20% test side, raw columns plus `Cover_Type`.
+    """
+    df = pd.read_csv(data_path)
+    _, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df[TARGET])
+    if n_rows < len(test_df):
+        _, test_df = train_test_split(test_df, test_size=n_rows, random_state=42, stratify=test_df[TARGET])
+    test_df[RAW_FEATURES + [TARGET]].to_csv(out_path, index=False)
+    print(f"Wrote {len(test_df):,} held-out rows to {out_path}")
+    return test_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the held-out sample used for the service's iteration curve.")
+    parser.add_argument("--data", default="covtype.csv", help="Path to the covtype CSV")
+    parser.add_argument("--out", default="holdout.csv")
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    export_holdout(args.data, args.out, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# ──────────────────────────────────────────────
+# Shadow Scoring
+# ──────────────────────────────────────────────
+# A candidate model scores the same preprocessed batches as the primary, but on a
+# background thread fed by a bounded queue. The request path only does a non-blocking
+# enqueue; when the queue is full the batch is shed (and counted) instead of waiting.
+N_CLASSES = 7
+LATENCY_WINDOW = 1000
+
+
+class ShadowScorer:
+    """
+    Background candidate scoring with online agreement, confusion and latency stats.
+
+    `confusion[i, j]` counts rows the primary served as class i (0-indexed) and the
+    candidate predicted as class j. The candidate is limited to `candidate_threads`
+    XGBoost threads so it cannot take every core from the primary.
+    """
+
+    def __init__(self, candidate, max_pending_rows: int = 50_000, candidate_threads: int = 1):
+        self.candidate = candidate
+        if candidate_threads:
+            self.candidate.set_params(n_jobs=candidate_threads)
+        self.max_pending_rows = max_pending_rows
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self.pending_rows = 0
+        self._reset_counters()
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def _reset_counters(self):
+        self.submitted_rows = 0
+        self.shed_rows = 0
+        self.shed_batches = 0
+        self.scored_rows = 0
+        self.scored_batches = 0
+        self.agreed_rows = 0
+        self.confusion = np.zeros((N_CLASSES, N_CLASSES), dtype=np.int64)
+        self.candidate_seconds = 0.0
+        self.batch_ms = deque(maxlen=LATENCY_WINDOW)
+        self.errors = 0
+        self.last_error = None
+
+    # ── request path ─────────────────────────────
+    def submit(self, X_processed, primary_preds: np.ndarray) -> bool:
+        """Queues a batch for the candidate; returns False if it was shed."""
+        n = len(primary_preds)
+        with self._cond:
+            if self.pending_rows + n > self.max_pending_rows:
+                self.shed_rows += n
+                self.shed_batches += 1
+                return False
+            self._pending.append((X_processed, primary_preds))
+            self.pending_rows += n
+            self.submitted_rows += n
+            self._cond.notify()
+        return True
+
+    # ── worker thread ────────────────────────────
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                X_processed, primary_preds = self._pending.popleft()
+                self.pending_rows -= len(primary_preds)
+
+            start = time.perf_counter()
+            try:
+                candidate_preds = self.candidate.predict_proba(X_processed).argmax(axis=1)
+            except Exception as e:
+                with self._cond:
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                continue
+            seconds = time.perf_counter() - start
+
+            pairs = np.bincount(
+                np.asarray(primary_preds, dtype=np.int64) * N_CLASSES + candidate_preds,
+                minlength=N_CLASSES * N_CLASSES,
+            ).reshape(N_CLASSES, N_CLASSES)
+            with self._cond:
+                self.confusion += pairs
+                self.agreed_rows += int(np.trace(pairs))
+                self.scored_rows += len(primary_preds)
+                self.scored_batches += 1
+                self.candidate_seconds += seconds
+                self.batch_ms.append(seconds * 1000)
+
+    def reset(self):
+        with self._cond:
+            self._reset_counters()
+
+    def stats(self, class_names: list[str]) -> dict:
+        with self._cond:
+            confusion = self.confusion.copy()
+            batch_ms = np.asarray(self.batch_ms)
+            scored = self.scored_rows
+            per_class = confusion.sum(axis=1)
+            return {
+                "submitted_rows": self.submitted_rows,
+                "scored_rows": scored,
+                "pending_rows": self.pending_rows,
+                "shed_rows": self.shed_rows,
+                "shed_batches": self.shed_batches,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "agreement_rate": round(self.agreed_rows / scored, 4) if scored else None,
+                "per_class_agreement": {
+                    name: round(float(confusion[i, i] / per_class[i]), 4) if per_class[i] else None
+                    for i, name in enumerate(class_names)
+                },
+                # rows: class served by the primary, columns: class predicted by the candidate
+                "confusion": {
+                    name: {other: int(confusion[i, j]) for j, other in enumerate(class_names)}
+                    for i, name in enumerate(class_names)
+                },
+                "candidate_latency": {
+                    "batches": self.scored_batches,
+                    "p50_batch_ms": round(float(np.percentile(batch_ms, 50)), 3) if len(batch_ms) else None,
+                    "p99_batch_ms": round(float(np.percentile(batch_ms, 99)), 3) if len(batch_ms) else None,
+                    "rows_per_sec": round(scored / self.candidate_seconds, 1) if self.candidate_seconds else None,
+                },
+            }
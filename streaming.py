@@ -0,0 +1,485 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+
+from features import RAW_CONTINUOUS_FEATURES, RAW_FEATURES, SOIL_FEATURES, WILDERNESS_FEATURES
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# ──────────────────────────────────────────────
+# WebSocket Streaming Predictions
+# ──────────────────────────────────────────────
+# Client frames are text JSON or binary MessagePack, holding one observation or a list:
+#   {"id": 17, "x": [54 values in API column order]}
+#   {"id": 18, "x": [10 continuous values, wilderness area 1–4, soil type 1–40]}
+# Replies use the same framing and are columnar, one frame per inference batch:
+#   {"type": "results", "ids": [...], "cover_type_ids": [...], "probabilities": [[7 floats], ...]}
+# Frames that arrive while a batch is being scored are coalesced into the next one.
+# Rejected observations get an error frame carrying their ids:
+#   {"type": "error", "ids": [...], "detail": "..."}
+COMPACT_FEATURES = RAW_CONTINUOUS_FEATURES + ["Wilderness_Area", "Soil_Type"]
+MAX_FRAME_ROWS = 1024
+MAX_PENDING_FRAMES = 256
+
+# Physical limits enforced on top of the HTTP schema's constraints wherever rows are
+# not validated by PredictionInput (stream frames, swept sweep values). They are kept
+# out of PredictionInput so HTTP callers see no change.
+PHYSICAL_BOUNDS = {
+    "Aspect": (0, 360),
+    "Slope": (0, 90),
+    "Horizontal_Distance_To_Hydrology": (0, np.inf),
+    "Horizontal_Distance_To_Roadways": (0, np.inf),
+    "Horizontal_Distance_To_Fire_Points": (0, np.inf),
+}
+
+
+def _expand_compact(X: np.ndarray) -> np.ndarray:
+    """
+    Compact rows to one-hot. An out-of-range or fractional code sets no flag, so the
+    row is rejected by `row_errors` like a full row without a flag.
+    """
+    n_cont = len(RAW_CONTINUOUS_FEATURES)
+    full = np.zeros((len(X), len(RAW_FEATURES)))
+    full[:, :n_cont] = X[:, :n_cont]
+    offset = n_cont
+    for column, n_flags in ((n_cont, len(WILDERNESS_FEATURES)), (n_cont + 1, len(SOIL_FEATURES))):
+        code = X[:, column]
+        valid = (code == np.floor(code)) & (code >= 1) & (code <= n_flags)
+        rows = np.flatnonzero(valid)
+        full[rows, offset + code[rows].astype(np.int64) - 1] = 1
+        offset += n_flags
+    return full
+
+
+def expand_rows(rows: list) -> np.ndarray:
+    """(n, 54) float64 matrix from full 54-value rows and/or 12-value compact rows."""
+    if not all(isinstance(r, (list, tuple)) for r in rows):
+        raise ValueError("'x' must be a list of numbers.")
+    is_full = np.array([len(r) == len(RAW_FEATURES) for r in rows])
+    is_compact = np.array([len(r) == len(COMPACT_FEATURES) for r in rows])
+    if not (is_full | is_compact).all():
+        raise ValueError(f"'x' must have {len(RAW_FEATURES)} values or {len(COMPACT_FEATURES)} compact values.")
+    if is_full.all():
+        return np.asarray(rows, dtype=np.float64)
+
+    X = np.empty((len(rows), len(RAW_FEATURES)))
+    if is_full.any():
+        X[is_full] = np.asarray([r for r, f in zip(rows, is_full) if f], dtype=np.float64)
+    X[is_compact] = _expand_compact(np.asarray([r for r, c in zip(rows, is_compact) if c], dtype=np.float64))
+    return X
+
+
+class FrameError(ValueError):
+    """A frame that cannot be scored at all; `ids` holds whatever ids could be read from it."""
+
+    def __init__(self, detail: str, ids: list | None = None):
+        super().__init__(detail)
+        self.ids = ids or []
+        self.binary = False
+
+
+def parse_frame(message: dict) -> tuple[list, np.ndarray, bool]:
+    """Turns one received ASGI message into (ids, X, binary). Raises FrameError on bad input."""
+    binary = message.get("bytes") is not None
+    try:
+        return _parse_payload(message, binary)
+    except FrameError as e:
+        e.binary = binary
+        raise
+
+
+def _parse_payload(message: dict, binary: bool) -> tuple[list, np.ndarray, bool]:
+    if binary and msgpack is None:
+        raise FrameError("Binary frames need the `msgpack` package on the server.")
+    try:
+        payload = msgpack.unpackb(message["bytes"], raw=False) if binary else json.loads(message.get("text") or "null")
+    except ValueError as e:
+        # JSON and MessagePack decode errors are both ValueErrors
+        raise FrameError(f"Could not decode frame: {e}")
+
+    observations = payload if isinstance(payload, list) else [payload]
+    ids = [o.get("id") if isinstance(o, dict) else None for o in observations]
+    if not observations or not all(isinstance(o, dict) and "x" in o for o in observations):
+        raise FrameError("Send an object {'id': ..., 'x': [...]} or a list of them.", ids)
+    if len(observations) > MAX_FRAME_ROWS:
+        raise FrameError(f"At most {MAX_FRAME_ROWS} observations per frame.", ids)
+    try:
+        X = expand_rows([o["x"] for o in observations])
+    except (ValueError, TypeError) as e:
+        raise FrameError(str(e), ids)
+    return ids, X, binary
+
+
+def input_bounds(schema, extra: dict | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-column (low, high, integral) over RAW_FEATURES, read from the `ge` / `le`
+    constraints and int annotations of a Pydantic model such as the HTTP routes'
+    `PredictionInput`, so both paths enforce the same bounds. `extra` maps a feature
+    to an additional (low, high) that is intersected with the schema's.
+    """
+    low = np.full(len(RAW_FEATURES), -np.inf)
+    high = np.full(len(RAW_FEATURES), np.inf)
+    integral = np.zeros(len(RAW_FEATURES), dtype=bool)
+    for j, name in enumerate(RAW_FEATURES):
+        field = schema.model_fields[name]
+        integral[j] = field.annotation is int
+        for constraint in field.metadata:
+            low[j] = getattr(constraint, "ge", low[j])
+            high[j] = getattr(constraint, "le", high[j])
+        if extra and name in extra:
+            low[j] = max(low[j], extra[name][0])
+            high[j] = min(high[j], extra[name][1])
+    return low, high, integral
+
+
+def row_errors(X: np.ndarray, bounds: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized validation of an (n, 54) matrix: finite values inside `bounds`, whole
+    numbers where the schema says int, and exactly one Wilderness and one Soil flag.
+    Returns (invalid mask, object array with the first problem of each invalid row).
+    """
+    low, high, integral = bounds
+    bad = ~np.isfinite(X) | (X < low) | (X > high) | (integral & (X != np.round(X)))
+    errors = np.full(len(X), None, dtype=object)
+
+    n_cont, n_wild = len(RAW_CONTINUOUS_FEATURES), len(WILDERNESS_FEATURES)
+    wilderness_set = X[:, n_cont:n_cont + n_wild].sum(axis=1)
+    soil_set = X[:, n_cont + n_wild:].sum(axis=1)
+    errors[soil_set != 1] = "Exactly one Soil_Type flag must be set (compact: Soil_Type 1–40)."
+    errors[wilderness_set != 1] = "Exactly one Wilderness_Area flag must be set (compact: Wilderness_Area 1–4)."
+    invalid = bad.any(axis=1) | (wilderness_set != 1) | (soil_set != 1)
+
+    rows = np.flatnonzero(bad.any(axis=1))
+    for i, j in zip(rows, bad[rows].argmax(axis=1)):
+        kind = "a whole number" if integral[j] else "a number"
+        errors[i] = f"{RAW_FEATURES[j]} must be {kind} between {low[j]:g} and {high[j]:g}."
+    return invalid, errors
+
+
+class StreamStats:
+    """Thread-safe counters for the streaming endpoint, with a 10-second message rate."""
+
+    WINDOW_S = 10
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.active_connections = 0
+        self.total_connections = 0
+        self.messages_in = 0
+        self.rows_scored = 0
+        self.batches = 0
+        self.errors = 0
+        self.inference_seconds = 0.0
+        self._recent = deque()            # (second, messages) buckets
+
+    def connection(self, opened: bool):
+        with self._lock:
+            self.active_connections += 1 if opened else -1
+            self.total_connections += 1 if opened else 0
+
+    def received(self, messages: int):
+        now = int(time.time())
+        with self._lock:
+            self.messages_in += messages
+            if self._recent and self._recent[-1][0] == now:
+                self._recent[-1] = (now, self._recent[-1][1] + messages)
+            else:
+                self._recent.append((now, messages))
+            while self._recent and self._recent[0][0] <= now - self.WINDOW_S:
+                self._recent.popleft()
+
+    def scored(self, rows: int, seconds: float):
+        with self._lock:
+            self.rows_scored += rows
+            self.batches += 1
+            self.inference_seconds += seconds
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+
+    def to_dict(self) -> dict:
+        now = int(time.time())
+        with self._lock:
+            recent = sum(n for second, n in self._recent if second > now - self.WINDOW_S)
+            uptime = time.time() - self.started
+            return {
+                "active_connections": self.active_connections,
+                "total_connections": self.total_connections,
+                "messages_in": self.messages_in,
+                "messages_per_sec": round(recent / self.WINDOW_S, 1),
+                "lifetime_messages_per_sec": round(self.messages_in / uptime, 1) if uptime else None,
+                "rows_scored": self.rows_scored,
+                "batches": self.batches,
+                "mean_batch_rows": round(self.rows_scored / self.batches, 1) if self.batches else None,
+                "mean_inference_ms": round(self.inference_seconds / self.batches * 1000, 3) if self.batches else None,
+                "errors": self.errors,
+            }
+
+
+async def _send(websocket: WebSocket, payload: dict, binary: bool):
+    if binary:
+        await websocket.send_bytes(msgpack.packb(payload, use_bin_type=True))
+    else:
+        await websocket.send_text(json.dumps(payload, separators=(",", ":")))
+
+
+def _disconnected(websocket: WebSocket) -> bool:
+    return WebSocketState.DISCONNECTED in (websocket.client_state, websocket.application_state)
+
+
+def _frame_rows(item) -> int:
+    return 0 if isinstance(item, FrameError) else len(item[0])
+
+
+async def _send_errors(websocket: WebSocket, ids: list, binary: np.ndarray, errors: np.ndarray):
+    """One error frame per (framing type, problem), listing the ids it applies to."""
+    groups = {}
+    for obs_id, is_binary, detail in zip(ids, binary, errors):
+        groups.setdefault((bool(is_binary), detail), []).append(obs_id)
+    for (is_binary, detail), group_ids in groups.items():
+        await _send(websocket, {"type": "error", "ids": group_ids, "detail": detail}, is_binary)
+
+
+async def serve_stream(websocket: WebSocket, predict_fn, stats: StreamStats, hello: dict,
+                       max_batch_rows: int, max_wait_ms: float, bounds: tuple):
+    """
+    Runs one accepted connection. A reader task parses frames onto a bounded queue; the
+    batcher drains everything queued (waiting up to `max_wait_ms` for more, capped at
+    `max_batch_rows`), validates the stacked rows against `bounds` (see `input_bounds`),
+    scores the valid ones with one `predict_fn(X) -> (raw_preds, probas)` call in the
+    thread pool and sends the results back. Rejected rows get error frames instead.
+
+    Backpressure: when the queue is full the reader stops reading, so a client that
+    outpaces inference is slowed down by TCP flow control rather than buffered in memory.
+
+    Only the batcher sends after the hello: the reader queues rejected frames (as
+    FrameError) next to good ones, so two tasks never write to the socket at once.
+    """
+    await websocket.send_text(json.dumps({"type": "hello", **hello}))
+    queue = asyncio.Queue(maxsize=MAX_PENDING_FRAMES)
+
+    async def reader():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                try:
+                    ids, X, binary = parse_frame(message)
+                except FrameError as e:
+                    stats.error()
+                    await queue.put(e)
+                    continue
+                stats.received(len(ids))
+                await queue.put((ids, X, binary))
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            if not _disconnected(websocket):
+                stats.error()
+                print(f" Stream reader failed: {type(e).__name__}: {e}")
+        finally:
+            # The batcher must always see the end-of-stream sentinel, even if this task
+            # fails or is cancelled; make room by dropping the oldest frame if needed
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    reader_task = asyncio.create_task(reader())
+    loop = asyncio.get_running_loop()
+    closing = False
+    try:
+        while not closing:
+            item = await queue.get()
+            if item is None:
+                break
+            items, rows = [item], _frame_rows(item)
+            deadline = loop.time() + max_wait_ms / 1000
+            while rows < max_batch_rows:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    closing = True
+                    break
+                items.append(item)
+                rows += _frame_rows(item)
+
+            for rejected in (i for i in items if isinstance(i, FrameError)):
+                await _send(websocket, {"type": "error", "ids": rejected.ids, "detail": str(rejected)}, rejected.binary)
+            items = [i for i in items if not isinstance(i, FrameError)]
+            if not items:
+                continue
+
+            ids = [obs_id for frame_ids, _, _ in items for obs_id in frame_ids]
+            X = np.concatenate([X_ for _, X_, _ in items])
+            binary = np.repeat([b for _, _, b in items], [len(X_) for _, X_, _ in items])
+
+            # Same bounds as PredictionInput on the HTTP routes, one vectorized pass
+            invalid, errors = row_errors(X, bounds)
+            if invalid.any():
+                stats.error()
+                await _send_errors(websocket, [ids[i] for i in np.flatnonzero(invalid)], binary[invalid], errors[invalid])
+            valid = np.flatnonzero(~invalid)
+            if not len(valid):
+                continue
+            ids, X, binary = [ids[i] for i in valid], X[valid], binary[valid]
+
+            start = time.perf_counter()
+            try:
+                raw_preds, probas = await run_in_threadpool(predict_fn, X)
+            except Exception as e:
+                # A scoring failure is reported against its ids; the connection stays open
+                stats.error()
+                print(f" Stream scoring failed: {type(e).__name__}: {e}")
+                await _send_errors(websocket, ids, binary, np.full(len(ids), f"Scoring failed: {type(e).__name__}"))
+                continue
+            stats.scored(len(X), time.perf_counter() - start)
+
+            # One reply per framing type, so binary and text clients both get what they sent
+            for is_binary in np.unique(binary):
+                idx = np.flatnonzero(binary == is_binary)
+                await _send(websocket, {
+                    "type": "results",
+                    "ids": [ids[i] for i in idx],
+                    "cover_type_ids": (raw_preds[idx] + 1).tolist(),
+                    "probabilities": probas[idx].astype(np.float64).round(4).tolist(),
+                }, bool(is_binary))
+    except WebSocketDisconnect:
+        pass
+    except RuntimeError:
+        # Starlette raises RuntimeError for a send after the client went away; anything
+        # else is a real failure
+        if not _disconnected(websocket):
+            raise
+    finally:
+        reader_task.cancel()
+        await asyncio.gather(reader_task, return_exceptions=True)
+
+
+# ──────────────────────────────────────────────
+# CLI: messages/sec over the socket vs one HTTP request per observation
+# ──────────────────────────────────────────────
+async def _bench_socket(url: str, rows: list, frame_rows: int, window: int, binary: bool) -> dict:
+    import websockets
+
+    latencies = []
+    sent_at = {}
+    limit = window * frame_rows
+    outstanding = 0
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.recv()                                        # hello
+        done = asyncio.Event()
+        room = asyncio.Event()
+        room.set()
+
+        async def receive():
+            nonlocal outstanding
+            received = 0
+            async for frame in ws:
+                payload = msgpack.unpackb(frame, raw=False) if binary else json.loads(frame)
+                if payload.get("type") == "error":
+                    raise RuntimeError(f"Server rejected ids {payload['ids'][:5]}...: {payload['detail']}")
+                ids = payload.get("ids", [])
+                now = time.perf_counter()
+                for i in ids:
+                    latencies.append(now - sent_at.pop(i))
+                received += len(ids)
+                outstanding -= len(ids)
+                room.set()
+                if received >= len(rows):
+                    done.set()
+                    return
+
+        receiver = asyncio.create_task(receive())
+        start = time.perf_counter()
+        for offset in range(0, len(rows), frame_rows):
+            while outstanding >= limit:
+                room.clear()
+                await room.wait()
+            frame = [{"id": i, "x": rows[i]} for i in range(offset, min(offset + frame_rows, len(rows)))]
+            now = time.perf_counter()
+            for obs in frame:
+                sent_at[obs["id"]] = now
+            outstanding += len(frame)
+            await (ws.send(msgpack.packb(frame, use_bin_type=True)) if binary else ws.send(json.dumps(frame)))
+        await done.wait()
+        elapsed = time.perf_counter() - start
+        receiver.cancel()
+
+    ms = np.asarray(latencies) * 1000
+    return {"messages_per_sec": len(rows) / elapsed, "p50_ms": np.percentile(ms, 50), "p99_ms": np.percentile(ms, 99)}
+
+
+def _bench_http(url: str, df, n: int) -> dict:
+    import requests
+
+    session = requests.Session()
+    payloads = df.head(n).to_dict(orient="records")
+    latencies = []
+    start = time.perf_counter()
+    for payload in payloads:
+        t = time.perf_counter()
+        session.post(f"{url}/predict", json=payload).raise_for_status()
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return {"messages_per_sec": len(payloads) / elapsed, "p50_ms": np.percentile(ms, 50), "p99_ms": np.percentile(ms, 99)}
+
+
+def main():
+    import pandas as pd
+    from forest_client.benchmark import spawn_server, synthetic_rows
+
+    parser = argparse.ArgumentParser(description="WebSocket streaming throughput vs one HTTP request per observation.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--http-messages", type=int, default=1_000)
+    parser.add_argument("--frame-rows", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--window", type=int, default=64, help="Frames in flight per connection")
+    parser.add_argument("--binary", action="store_true", help="Send MessagePack frames instead of JSON")
+    args = parser.parse_args()
+
+    df = synthetic_rows(args.messages)
+    rows = df[RAW_FEATURES].to_numpy(dtype=float).tolist()
+    url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+    proc = spawn_server(args.port, 1) if args.spawn else None
+    try:
+        results = [{"transport": "HTTP /predict", **_bench_http(url, df, args.http_messages)}]
+        ws_url = url.replace("http", "ws", 1) + "/ws/predict"
+        for frame_rows in args.frame_rows:
+            stats = asyncio.run(_bench_socket(ws_url, rows, frame_rows, args.window, args.binary))
+            results.append({"transport": f"WebSocket, {frame_rows}/frame", **stats})
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    report = pd.DataFrame(results)
+    report["speedup"] = report["messages_per_sec"] / report.loc[0, "messages_per_sec"]
+    print(report.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
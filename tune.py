@@ -0,0 +1,353 @@
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import optuna
+import xgboost as xgb
+from sklearn.metrics import matthews_corrcoef
+from sklearn.model_selection import StratifiedKFold
+from sklearn.utils.class_weight import compute_sample_weight
+
+from features import build_preprocessor, load_dataset
+from training import CACHE_DIR, prepare_folds
+
+# ──────────────────────────────────────────────
+# Search Configuration
+# ──────────────────────────────────────────────
+DEFAULT_STORAGE = "sqlite:///forest_optuna.db"
+DEFAULT_STUDY = "xgb-champion"
+
+BASE_BOOSTER_PARAMS = {
+    "objective": "multi:softprob",
+    "num_class": 7,
+    "tree_method": "hist",
+    "eval_metric": "mlogloss",
+    "seed": 42,
+}
+
+
+def suggest_params(trial: optuna.Trial) -> dict:
+    """Same Bayesian search space as the notebook's `objective`."""
+    return {
+        "max_depth": trial.suggest_int("max_depth", 6, 14),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2, log=True),
+        "n_estimators": trial.suggest_int("n_estimators", 100, 300),
+        "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
+        "gamma": trial.suggest_float("gamma", 1e-8, 1.0, log=True),
+        "subsample": trial.suggest_float("subsample", 0.6, 1.0),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.6, 1.0),
+    }
+
+
+def make_pruner(name: str) -> optuna.pruners.BasePruner:
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=20)
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=10, reduction_factor=3)
+    return optuna.pruners.NopPruner()
+
+
+def make_storage(url: str) -> optuna.storages.RDBStorage:
+    # Several worker processes write to the same SQLite file; wait on the lock instead of failing
+    return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": 60}})
+
+
+# ──────────────────────────────────────────────
+# Per-Worker DMatrix Cache
+# ──────────────────────────────────────────────
+# Quantile sketches are built once per fold per worker process and reused by every
+# trial it runs; the search space never touches `max_bin`, so the bins stay valid.
+_dmatrix_cache = {}
+
+
+def load_fold_dmatrices(fold_path: str):
+    if fold_path not in _dmatrix_cache:
+        with np.load(fold_path) as cached:
+            X_train, X_val = cached["X_train"], cached["X_val"]
+            y_train, y_val = cached["y_train"], cached["y_val"]
+        sample_weights = compute_sample_weight(class_weight="balanced", y=y_train)
+        dtrain = xgb.QuantileDMatrix(X_train, label=y_train, weight=sample_weights)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain)
+        _dmatrix_cache[fold_path] = (dtrain, dval, y_val)
+    return _dmatrix_cache[fold_path]
+
+
+class OptunaPruningCallback(xgb.callback.TrainingCallback):
+    """Reports the per-round validation log-loss to Optuna and aborts pruned trials."""
+
+    def __init__(self, trial: optuna.Trial, metric: str = "mlogloss"):
+        self.trial = trial
+        self.metric = metric
+
+    def after_iteration(self, model, epoch, evals_log):
+        score = evals_log["validation"][self.metric][-1]
+        # The study maximizes MCC, so report negated log-loss to keep "higher is better"
+        self.trial.report(-score, step=epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Pruned at round {epoch}")
+        return False
+
+
+def make_objective(fold_paths: list[str], nthread: int, device: str | None = None):
+    def objective(trial: optuna.Trial) -> float:
+        params = suggest_params(trial)
+        num_rounds = params.pop("n_estimators")
+        booster_params = {**BASE_BOOSTER_PARAMS, **params, "nthread": nthread}
+        if device:
+            booster_params["device"] = device
+
+        mcc_scores = []
+        for i, fold_path in enumerate(fold_paths):
+            dtrain, dval, y_val = load_fold_dmatrices(fold_path)
+            # Prune on the first fold only; survivors are scored on every fold
+            callbacks = [OptunaPruningCallback(trial)] if i == 0 else None
+            booster = xgb.train(
+                booster_params,
+                dtrain,
+                num_boost_round=num_rounds,
+                evals=[(dval, "validation")],
+                callbacks=callbacks,
+                verbose_eval=False,
+            )
+            preds = booster.predict(dval).argmax(axis=1)
+            mcc_scores.append(matthews_corrcoef(y_val, preds))
+
+        return float(np.mean(mcc_scores))
+
+    return objective
+
+
+def _worker(storage_url, study_name, pruner_name, fold_paths, n_trials, nthread, device, seed, replay=None):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    sampler = optuna.samplers.TPESampler(seed=seed)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=make_storage(storage_url),
+        sampler=sampler,
+        pruner=make_pruner(pruner_name),
+    )
+    objective = make_objective(fold_paths, nthread, device)
+    if replay is None:
+        study.optimize(objective, n_trials=n_trials)
+        return
+    # Pin every parameter per trial rather than enqueueing: SQLite lets two workers
+    # pop the same waiting trial
+    warnings.filterwarnings("ignore", category=optuna.exceptions.ExperimentalWarning)
+    for params in replay:
+        study.sampler = optuna.samplers.PartialFixedSampler(params, sampler)
+        study.optimize(objective, n_trials=1)
+
+
+# ──────────────────────────────────────────────
+# Parallel Search
+# ──────────────────────────────────────────────
+def _run_workers(storage_url, study_name, pruner, fold_paths, n_trials, n_workers, device, seed_offset,
+                 replay: list[dict] | None = None) -> float:
+    """
+    Spreads `n_trials` over `n_workers` processes on one shared study (or, with
+    `replay`, deals those parameter sets out round-robin); returns the wall-clock seconds.
+    """
+    nthread = max(1, (os.cpu_count() or 1) // n_workers)
+    if replay is not None:
+        slices = [replay[i::n_workers] for i in range(n_workers)]
+        per_worker = [len(part) for part in slices]
+    else:
+        slices = [None] * n_workers
+        per_worker = [n_trials // n_workers + (1 if i < n_trials % n_workers else 0) for i in range(n_workers)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [
+            pool.submit(
+                _worker, storage_url, study_name, pruner, fold_paths, count, nthread, device,
+                seed_offset + i, slices[i],
+            )
+            for i, count in enumerate(per_worker) if count
+        ]
+        for f in futures:
+            f.result()
+    return time.perf_counter() - start
+
+
+def _print_best(study: optuna.Study):
+    # best_value / best_params raise ValueError until at least one trial has completed
+    if not study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)):
+        print("Best MCC Score: n/a (no trial has completed; all were pruned or failed)")
+        return
+    print(f"Best MCC Score: {study.best_value:.4f}")
+    print("Best Hyperparameters:")
+    for key, value in study.best_params.items():
+        print(f"  {key}: {value}")
+
+
+def run_search(
+    X,
+    y,
+    study_name: str = DEFAULT_STUDY,
+    storage_url: str = DEFAULT_STORAGE,
+    n_trials: int = 15,
+    n_workers: int = 1,
+    pruner: str = "median",
+    n_splits: int = 3,
+    cache_dir: str = CACHE_DIR,
+    device: str | None = None,
+) -> tuple[optuna.Study, float, list]:
+    """
+    Runs the notebook's search space across `n_workers` processes sharing one SQLite
+    study. Re-running with the same study name and storage resumes the study.
+    Returns the study, the measured trials/hour and the trials run in this session.
+    """
+    fold_paths = prepare_folds(X, y, n_splits=n_splits, cache_dir=cache_dir)
+
+    study = optuna.create_study(
+        study_name=study_name,
+        storage=make_storage(storage_url),
+        direction="maximize",
+        load_if_exists=True,
+    )
+    n_existing = len(study.trials)
+    if n_existing:
+        print(f"Resuming study '{study_name}' with {n_existing} existing trials.")
+
+    nthread = max(1, (os.cpu_count() or 1) // n_workers)
+    print(f"Running {n_trials} trials on {n_workers} workers x {nthread} threads ({pruner} pruning)...")
+    elapsed = _run_workers(storage_url, study_name, pruner, fold_paths, n_trials, n_workers, device, n_existing)
+
+    study = optuna.load_study(study_name=study_name, storage=make_storage(storage_url))
+    session_trials = study.trials[n_existing:]
+    states = [t.state for t in session_trials]
+    trials_per_hour = len(session_trials) / elapsed * 3600
+
+    print("\n" + "=" * 50)
+    print("OPTUNA TUNING COMPLETE")
+    print("=" * 50)
+    print(f"Trials this session: {len(session_trials)} "
+          f"({states.count(optuna.trial.TrialState.COMPLETE)} complete, "
+          f"{states.count(optuna.trial.TrialState.PRUNED)} pruned)")
+    print(f"Elapsed:      {elapsed:.1f}s")
+    print(f"Throughput:   {trials_per_hour:.1f} trials/hour")
+    _print_best(study)
+
+    return study, trials_per_hour, session_trials
+
+
+# ──────────────────────────────────────────────
+# Comparison: the same parameter sets through both objectives
+# ──────────────────────────────────────────────
+# Timing trials that each draw their own TPE parameters mostly measures how expensive
+# those parameters are (max_depth and n_estimators dominate). Both sides therefore
+# replay one fixed list of parameter sets taken from the tuned session.
+def replay_params(trials: list, n: int) -> list[dict]:
+    """Parameters of the first `n` trials that got far enough to have been sampled in full."""
+    finished = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    return [t.params for t in trials if t.state in finished][:n]
+
+
+def notebook_trials_per_hour(X, y, params_list: list[dict], n_splits: int = 3) -> float:
+    """
+    Replays `params_list` through the notebook's original objective: serial, no
+    pruning, the preprocessor refit on every fold and a fresh XGBClassifier per fold.
+    """
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+
+    def objective(trial):
+        param = {
+            "objective": "multi:softmax",
+            "num_class": 7,
+            "tree_method": "hist",
+            "random_state": 42,
+            **suggest_params(trial),
+        }
+        mcc_scores = []
+        for train_idx, val_idx in skf.split(X, y):
+            preprocessor = build_preprocessor()
+            X_train_processed = preprocessor.fit_transform(X.iloc[train_idx])
+            X_val_processed = preprocessor.transform(X.iloc[val_idx])
+            sample_weights = compute_sample_weight(class_weight="balanced", y=y.iloc[train_idx])
+            model = xgb.XGBClassifier(**param)
+            model.fit(X_train_processed, y.iloc[train_idx], sample_weight=sample_weights, verbose=False)
+            mcc_scores.append(matthews_corrcoef(y.iloc[val_idx], model.predict(X_val_processed)))
+        return np.mean(mcc_scores)
+
+    study = optuna.create_study(direction="maximize")
+    for params in params_list:
+        study.enqueue_trial(params)
+    start = time.perf_counter()
+    study.optimize(objective, n_trials=len(params_list))
+    return len(params_list) / (time.perf_counter() - start) * 3600
+
+
+def tuned_trials_per_hour(
+    params_list: list[dict],
+    fold_paths: list[str],
+    n_workers: int = 1,
+    pruner: str = "median",
+    device: str | None = None,
+) -> float:
+    """
+    Replays `params_list` through this module's objective (worker pool, cached
+    QuantileDMatrix folds, pruning) on a throwaway SQLite study.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        storage_url = f"sqlite:///{os.path.join(tmp, 'replay.db')}"
+        optuna.create_study(study_name="replay", storage=make_storage(storage_url), direction="maximize")
+        elapsed = _run_workers(
+            storage_url, "replay", pruner, fold_paths, len(params_list), n_workers, device, 0, replay=params_list,
+        )
+    return len(params_list) / elapsed * 3600
+
+
+# ──────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, pruned Optuna search with persistent SQLite storage.")
+    parser.add_argument("--data", default="covtype.csv", help="Path to the covtype CSV")
+    parser.add_argument("--study-name", default=DEFAULT_STUDY, help="Reuse a name to resume a study")
+    parser.add_argument("--storage", default=DEFAULT_STORAGE)
+    parser.add_argument("--trials", type=int, default=15)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pruner", choices=["median", "halving", "none"], default="median")
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--device", default=None, help="XGBoost device, e.g. 'cuda'")
+    parser.add_argument(
+        "--compare-notebook", type=int, default=0, metavar="N",
+        help="Replay the first N parameter sets of this session through the notebook's serial, "
+             "unpruned objective and through this search, and compare trials/hour",
+    )
+    args = parser.parse_args()
+
+    X, y = load_dataset(args.data)
+    _, trials_per_hour, session_trials = run_search(
+        X, y,
+        study_name=args.study_name,
+        storage_url=args.storage,
+        n_trials=args.trials,
+        n_workers=args.workers,
+        pruner=args.pruner,
+        n_splits=args.folds,
+        cache_dir=args.cache_dir,
+        device=args.device,
+    )
+
+    if args.compare_notebook:
+        params_list = replay_params(session_trials, args.compare_notebook)
+        if not params_list:
+            print("\nNo completed or pruned trials this session to replay; skipping the comparison.")
+            return
+        fold_paths = prepare_folds(X, y, n_splits=args.folds, cache_dir=args.cache_dir)
+        print(f"\nReplaying the same {len(params_list)} parameter sets through both objectives...")
+        tuned = tuned_trials_per_hour(params_list, fold_paths, args.workers, args.pruner, args.device)
+        baseline = notebook_trials_per_hour(X, y, params_list, n_splits=args.folds)
+        print(f"Notebook objective: {baseline:.1f} trials/hour")
+        print(f"This search:        {tuned:.1f} trials/hour ({tuned / baseline:.1f}x)")
+        print(f"(Full session throughput, own TPE draws: {trials_per_hour:.1f} trials/hour)")
+
+
+if __name__ == "__main__":
+    main()